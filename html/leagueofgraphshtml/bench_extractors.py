@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the three extractor generations over the saved pages.
+
+Generations (each runs its own extraction path per page: read, find blocks, parse, CSV per queue)
+- v0:        extract_lpdata.py (raw rows per queue, no preprocessing)
+- v1:        extract_lpdata_daily_last.py (daily-last CSVs)
+- v2:        extract_lpdata_daily_last_v2.py process_file (daily-last CSVs, the format v1 writes)
+- v2-json / v2-stream / v2-mmap: v2 with --decoder json / --stream / --mmap
+
+Reported per page and per generation
+- time (best of --repeat runs), MB/s over the page size, rows/s over the CSV rows written
+- peak Python heap (tracemalloc, one extra run; mmap'd pages are not heap)
+- output equality: sha256 of the CSVs against the --reference generation (default v2; v0 writes a
+  different kind of CSV and is only compared with itself across baselines). A generation that writes
+  nothing for a page (v1 rejects pages whose rankData <img> markup its scanner misreads) shows as DIFF
+
+Baselines
+- --save PATH writes the results as JSON; --compare PATH prints the change against such a file
+  per generation and lists pages that got slower than --threshold or whose output changed
+  (exit code 1 with --fail-on-regression)
+
+Usage examples
+  python bench_extractors.py
+  python bench_extractors.py --gen v1 --gen v2 --repeat 5 --save bench_baseline.json
+  python bench_extractors.py --compare bench_baseline.json --threshold 15 --fail-on-regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import extract_lpdata as gen_v0
+import extract_lpdata_daily_last as gen_v1
+import extract_lpdata_daily_last_v2 as gen_v2
+
+HERE = Path(__file__).resolve().parent
+BASELINE_VERSION = 1
+
+# (page, out_dir) -> CSV rows written
+Runner = Callable[[Path, Path], int]
+
+
+def _present_queues(html: str) -> List[str]:
+    queues = []
+    if 'id="rankingHistory-1"' in html:
+        queues.append("solo")
+    if 'id="rankingHistory-2"' in html:
+        queues.append("flex")
+    return queues
+
+
+def run_v0(page: Path, out_dir: Path) -> int:
+    html = page.read_text(encoding="utf-8", errors="ignore")
+    name = gen_v0.extract_title_name(html, page.name)
+    rows = 0
+    for q in _present_queues(html):
+        try:
+            recs = gen_v0.parse_queue(html, q, name)
+        except ValueError:  # v0 has no fallback for literals json.loads rejects
+            continue
+        if recs:
+            gen_v0.write_csv(recs, out_dir / f"{page.stem}.{q}.csv")
+            rows += len(recs)
+    return rows
+
+
+def run_v1(page: Path, out_dir: Path) -> int:
+    # the body of v1's main() loop for --queue auto
+    html = page.read_text(encoding="utf-8", errors="ignore")
+    name = gen_v1._extract_name(html, page.name)
+    rows = 0
+    for q in _present_queues(html):
+        recs = gen_v1.extract_queue(html, q, name)
+        if recs:
+            gen_v1.write_csv(recs, out_dir / f"{page.stem}.{q}.csv")
+            rows += len(recs)
+    return rows
+
+
+def v2_runner(*options: str) -> Runner:
+    parsed: List[argparse.Namespace] = []  # parsed on first use, outside of any timing
+
+    def run(page: Path, out_dir: Path) -> int:
+        if not parsed:
+            parsed.append(gen_v2.parse_args(list(options)))
+        args = argparse.Namespace(**vars(parsed[0]))
+        args.out_dir = out_dir
+        res = gen_v2.process_file(page, args)
+        return sum(n for _, _, n in res.outputs)
+    return run
+
+
+# name -> (runner, output kind); only generations of the same kind are compared
+GENERATIONS: Dict[str, Tuple[Runner, str]] = {
+    "v0": (run_v0, "raw"),
+    "v1": (run_v1, "daily"),
+    "v2": (v2_runner(), "daily"),
+    "v2-json": (v2_runner("--decoder", "json"), "daily"),
+    "v2-stream": (v2_runner("--stream"), "daily"),
+    "v2-mmap": (v2_runner("--mmap"), "daily"),
+}
+DEFAULT_GENERATIONS = ["v0", "v1", "v2"]
+
+
+@dataclass
+class PageRun:
+    page: str               # path relative to the corpus root
+    bytes: int
+    seconds: float          # best of --repeat
+    rows: int
+    peak: int = 0           # tracemalloc peak, bytes (0 = not measured)
+    digest: str = ""        # sha256 over the CSVs written (name + content)
+    equal: Optional[bool] = None  # vs --reference (None = not comparable)
+
+
+def default_corpus() -> List[Path]:
+    """*.html of every checked-in html/leagueofgraphshtml* folder."""
+    pages: List[Path] = []
+    for d in sorted(HERE.parent.glob("leagueofgraphshtml*")):
+        if d.is_dir():
+            pages.extend(sorted(d.glob("*.html")))
+    return pages
+
+
+def _outputs_digest(out_dir: Path) -> str:
+    h = hashlib.sha256()
+    for f in sorted(out_dir.glob("*.csv")):
+        h.update(f.name.encode("utf-8") + b"\0")
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def _fresh_dir(root: Path, label: str) -> Path:
+    d = root / label
+    if d.exists():
+        for f in d.iterdir():
+            f.unlink()
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def bench_page(run: Runner, page: Path, rel: str, work: Path, repeat: int, memory: bool) -> PageRun:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        out_dir = _fresh_dir(work, "run")
+        t0 = time.perf_counter()
+        rows = run(page, out_dir)
+        best = min(best, time.perf_counter() - t0)
+    result = PageRun(page=rel, bytes=page.stat().st_size, seconds=best, rows=rows,
+                     digest=_outputs_digest(out_dir))
+
+    if memory:
+        out_dir = _fresh_dir(work, "mem")
+        tracemalloc.start()
+        try:
+            run(page, out_dir)
+            result.peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _mbps(nbytes: int, seconds: float) -> float:
+    return nbytes / 1e6 / seconds if seconds > 0 else 0.0
+
+
+def _per_s(n: int, seconds: float) -> float:
+    return n / seconds if seconds > 0 else 0.0
+
+
+def summarize(runs: List[PageRun]) -> Dict[str, float]:
+    nbytes = sum(r.bytes for r in runs)
+    seconds = sum(r.seconds for r in runs)
+    rows = sum(r.rows for r in runs)
+    return {"pages": len(runs), "bytes": nbytes, "seconds": seconds, "rows": rows,
+            "mb_per_s": _mbps(nbytes, seconds), "rows_per_s": _per_s(rows, seconds),
+            "peak": max((r.peak for r in runs), default=0)}
+
+
+def _eq_mark(equal: Optional[bool]) -> str:
+    return "-" if equal is None else ("same" if equal else "DIFF")
+
+
+def format_report(results: Dict[str, List[PageRun]], per_page: bool) -> List[str]:
+    lines: List[str] = []
+    if per_page:
+        lines.append(f"{'gen':<10}{'ms':>9}{'MB/s':>8}{'rows':>7}{'rows/s':>10}{'peakMB':>8}{'eq':>6}  page")
+        for gen, runs in results.items():
+            for r in runs:
+                lines.append(f"{gen:<10}{r.seconds * 1e3:>9.2f}{_mbps(r.bytes, r.seconds):>8.0f}{r.rows:>7}"
+                             f"{_per_s(r.rows, r.seconds):>10.0f}{r.peak / 1e6:>8.1f}{_eq_mark(r.equal):>6}  {r.page}")
+        lines.append("")
+
+    lines.append(f"{'gen':<10}{'pages':>6}{'MB':>8}{'total_s':>9}{'MB/s':>8}{'rows':>7}{'rows/s':>10}"
+                 f"{'peakMB':>8}  output")
+    for gen, runs in results.items():
+        t = summarize(runs)
+        flags = [r.equal for r in runs]
+        if all(f is None for f in flags):
+            eq = "-"
+        else:
+            diff = sum(1 for f in flags if f is False)
+            eq = "same" if not diff else f"DIFF {diff}개"
+        lines.append(f"{gen:<10}{t['pages']:>6}{t['bytes'] / 1e6:>8.1f}{t['seconds']:>9.3f}{t['mb_per_s']:>8.0f}"
+                     f"{t['rows']:>7}{t['rows_per_s']:>10.0f}{t['peak'] / 1e6:>8.1f}  {eq}")
+    return lines
+
+
+def save_baseline(path: Path, results: Dict[str, List[PageRun]], repeat: int) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "generations": {gen: {"total": summarize(runs), "pages": [asdict(r) for r in runs]}
+                        for gen, runs in results.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+
+def compare_baseline(path: Path, results: Dict[str, List[PageRun]], threshold: float) -> Tuple[List[str], bool]:
+    """Report lines against a saved baseline, and whether anything regressed."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"지원하지 않는 기준선 버전 {data.get('version')!r}")
+    lines = [f"[COMPARE] 기준선 {path.name} ({data.get('created')}, Python {data.get('python')}), "
+             f"느려짐 기준 +{threshold:g}%"]
+    regressed = False
+    for gen, runs in results.items():
+        base = data["generations"].get(gen)
+        if base is None:
+            lines.append(f"{gen:<10} 기준선에 없음")
+            continue
+        old_pages = {p["page"]: p for p in base["pages"]}
+        common = [r for r in runs if r.page in old_pages]
+        if not common:
+            lines.append(f"{gen:<10} 공통 페이지 없음")
+            continue
+        old_s = sum(old_pages[r.page]["seconds"] for r in common)
+        new_s = sum(r.seconds for r in common)
+        change = 100.0 * (new_s - old_s) / old_s if old_s else 0.0
+        slower = [(r, old_pages[r.page]) for r in common
+                  if old_pages[r.page]["seconds"] and
+                  100.0 * (r.seconds - old_pages[r.page]["seconds"]) / old_pages[r.page]["seconds"] > threshold]
+        changed = [r for r in common if r.digest != old_pages[r.page]["digest"]]
+        mark = "REGRESSION" if change > threshold else "ok"
+        lines.append(f"{gen:<10} {old_s:.3f} s -> {new_s:.3f} s ({change:+.1f}%) {mark}, "
+                     f"느려진 페이지 {len(slower)}개, 출력 바뀐 페이지 {len(changed)}개")
+        for r, old in sorted(slower, key=lambda ro: ro[0].seconds / ro[1]["seconds"], reverse=True):
+            lines.append(f"    slower  {old['seconds'] * 1e3:8.2f} -> {r.seconds * 1e3:8.2f} ms  {r.page}")
+        for r in changed:
+            lines.append(f"    output  {r.page}")
+        regressed = regressed or change > threshold or bool(changed)
+    return lines, regressed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("html", nargs="*", type=Path,
+                    help="측정할 HTML (미지정 시 html/leagueofgraphshtml* 폴더의 *.html 전부)")
+    ap.add_argument("--gen", action="append", choices=list(GENERATIONS), default=None,
+                    help=f"측정할 세대 (여러 번 가능, 기본 {' '.join(DEFAULT_GENERATIONS)})")
+    ap.add_argument("--reference", choices=list(GENERATIONS), default="v2",
+                    help="출력 비교 기준 세대 (같은 종류의 CSV를 쓰는 세대끼리만 비교)")
+    ap.add_argument("--repeat", type=int, default=3, help="페이지마다 반복 횟수 (가장 빠른 값 사용)")
+    ap.add_argument("--no-memory", action="store_true", help="tracemalloc 최대 메모리 측정 생략")
+    ap.add_argument("--per-page", action="store_true", help="페이지별 표도 출력")
+    ap.add_argument("--save", type=Path, default=None, metavar="PATH", help="결과를 기준선 JSON으로 저장")
+    ap.add_argument("--compare", type=Path, default=None, metavar="PATH", help="저장된 기준선과 비교")
+    ap.add_argument("--threshold", type=float, default=10.0, help="느려짐으로 볼 변화율 %% (기본 10)")
+    ap.add_argument("--fail-on-regression", action="store_true",
+                    help="--compare에서 느려졌거나 출력이 바뀌면 종료 코드 1")
+    args = ap.parse_args()
+
+    if args.repeat < 1:
+        raise SystemExit("--repeat: 1 이상이어야 함")
+    pages = [p.resolve() for p in args.html] if args.html else default_corpus()
+    pages = [p for p in pages if p.is_file()]
+    if not pages:
+        raise SystemExit("측정할 HTML 파일이 없음. (*.html)")
+    gens = args.gen or DEFAULT_GENERATIONS
+    if args.reference not in gens:
+        gens = [args.reference] + [g for g in gens if g != args.reference]
+
+    root = HERE.parent
+    rels = [str(p.relative_to(root)) if p.is_relative_to(root) else str(p) for p in pages]
+    print(f"[BENCH] 페이지 {len(pages)}개 ({sum(p.stat().st_size for p in pages) / 1e6:.1f} MB), "
+          f"세대 {', '.join(gens)}, 반복 {args.repeat}회")
+
+    results: Dict[str, List[PageRun]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_lpdata_") as tmp:
+        for gen in gens:
+            run, _ = GENERATIONS[gen]
+            work = Path(tmp) / gen
+            results[gen] = [bench_page(run, p, rel, work, args.repeat, not args.no_memory)
+                            for p, rel in zip(pages, rels)]
+
+    ref_kind = GENERATIONS[args.reference][1]
+    ref_digest = {r.page: r.digest for r in results[args.reference]}
+    for gen, runs in results.items():
+        if GENERATIONS[gen][1] == ref_kind:
+            for r in runs:
+                r.equal = r.digest == ref_digest[r.page]
+
+    for line in format_report(results, args.per_page):
+        print(line)
+
+    regressed = False
+    if args.compare is not None:
+        try:
+            lines, regressed = compare_baseline(args.compare, results, args.threshold)
+        except (OSError, ValueError, KeyError) as e:
+            raise SystemExit(f"--compare: 기준선을 읽을 수 없음 ({e})")
+        for line in lines:
+            print(line)
+    if args.save is not None:
+        save_baseline(args.save, results, args.repeat)
+        print(f"[SAVE] {args.save}")
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
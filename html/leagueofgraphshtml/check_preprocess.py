@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Randomized equivalence check of the preprocess backends in extract_lpdata_daily_last_v2.py.
+
+Every generated history goes through _preprocess_reference() (the rules one pass at a time) and
+through each checked backend; the output columns (ts, day, tier, lp, score) and the rows each rule
+dropped must match exactly.
+
+Backends checked
+- python: the fused single pass, preprocess(..., "python") with a RuleRun (counts per rule)
+- python-plain: the same pass without accounting, preprocess(..., "python") (output only)
+- numpy: _preprocess_numpy() (skipped with a note when NumPy is not installed)
+- auto:  preprocess(..., "auto") on histories of NUMPY_MIN_ROWS - 1, NUMPY_MIN_ROWS and
+         NUMPY_MIN_ROWS + 1 rows, which must also pick the backend the threshold says
+
+Generated histories (one random.Random per case, seeded "<seed>:<case>"; a failure prints the
+--seed/--case/--rows that rerun it)
+- a walk over a few states (Iron IV 0LP, near misses like Iron IV 1LP / Iron III 0LP, Bronze, Gold)
+- unchanged-state resamples (consecutive_duplicates), Iron0 minutes after a real sample
+  (iron0_same_day_glitch), Iron0-only days between equal states (iron0_sandwich), several samples
+  per day (keep_last_per_day), equal timestamps
+- rows in ts order, fully shuffled, or with a few local swaps (the sort / stable-sort step)
+- sizes from 0 rows up to --max-rows, plus the NUMPY_MIN_ROWS boundary cases
+The run ends with the number of cases in which each rule dropped rows, so a generator change that
+stops exercising a rule shows up.
+
+Usage examples
+  python check_preprocess.py
+  python check_preprocess.py --cases 5000 --seed 7
+  python check_preprocess.py --seed 7 --case 1234
+  python check_preprocess.py --seed 7 --case 2001 --rows 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import extract_lpdata_daily_last_v2 as v2
+from extract_lpdata_daily_last_v2 import (
+    NUMPY_MIN_ROWS,
+    RULE_NAMES,
+    RecBatch,
+    RuleRun,
+    _calc_score_from_ids,
+    _preprocess_numpy,
+    _preprocess_reference,
+    day_bucketer,
+    preprocess,
+)
+
+MS_PER_MIN = 60_000
+MS_PER_DAY = 86_400_000
+BASE_TS = 1_600_000_000_000
+
+# (tier string, tier id, rank id, lp); the first entry is the Iron0 glitch state
+STATES = [
+    ("Iron IV", 1, 4, 0),
+    ("Iron IV", 1, 4, 1),
+    ("Iron III", 1, 3, 0),
+    ("Bronze I", 2, 1, 50),
+    ("Bronze I", 2, 1, 51),
+    ("Gold IV", 4, 4, 0),
+    ("Gold IV", 4, 4, 75),
+]
+IRON0 = STATES[0]
+
+# recs, RuleRun -> output; fills RuleRun.dropped (except the backends in UNCOUNTED)
+Backend = Callable[[RecBatch, RuleRun], RecBatch]
+Columns = List[Tuple[int, int, str, int, float]]
+
+
+def _run_python(recs: RecBatch, rules: RuleRun) -> RecBatch:
+    return preprocess(recs, "python", rules)
+
+
+def _run_python_plain(recs: RecBatch, rules: RuleRun) -> RecBatch:
+    return preprocess(recs, "python")
+
+
+def _run_numpy(recs: RecBatch, rules: RuleRun) -> RecBatch:
+    return _preprocess_numpy(recs, rules)
+
+
+def _run_auto(recs: RecBatch, rules: RuleRun) -> RecBatch:
+    return preprocess(recs, "auto", rules)
+
+
+BACKENDS: Dict[str, Backend] = {"python": _run_python, "python-plain": _run_python_plain}
+UNCOUNTED = {"python-plain"}
+if v2.np is not None:
+    BACKENDS["numpy"] = _run_numpy
+
+
+def gen_history(rnd: random.Random, n: int) -> List[Tuple[int, Tuple[str, int, int, int]]]:
+    """n (ts, state) samples of one player, in ts order."""
+    out: List[Tuple[int, Tuple[str, int, int, int]]] = []
+    ts = BASE_TS + rnd.randrange(MS_PER_DAY)
+    state = rnd.choice(STATES[1:])
+    dup, glitch, lone, change = (rnd.random() for _ in range(4))  # per-history event mix
+    while len(out) < n:
+        x = rnd.random() * (dup + glitch + lone + change)
+        if x < dup:  # unchanged state re-sampled (sometimes at the same ms)
+            ts += rnd.choice([0, MS_PER_MIN, 3 * 3_600_000, MS_PER_DAY])
+            out.append((ts, state))
+        elif x < dup + glitch:  # Iron0 right after a real sample, same day
+            ts += rnd.choice([0, MS_PER_MIN, 10 * MS_PER_MIN])
+            out.append((ts, IRON0))
+        elif x < dup + glitch + lone:  # Iron0-only day(s), then the state again (sandwich)
+            ts += MS_PER_DAY * rnd.randint(1, 2)
+            for _ in range(rnd.randint(1, 3)):
+                out.append((ts, IRON0))
+                ts += rnd.choice([0, MS_PER_MIN])
+            ts += MS_PER_DAY
+            out.append((ts, state if rnd.random() < 0.8 else rnd.choice(STATES)))
+        else:
+            ts += rnd.choice([MS_PER_MIN, 2 * 3_600_000, MS_PER_DAY, 3 * MS_PER_DAY])
+            state = rnd.choice(STATES)
+            out.append((ts, state))
+    return out[:n]
+
+
+def shuffle_rows(rnd: random.Random, rows: list) -> str:
+    """Reorder rows in place like an unsorted page can; returns the kind of order produced."""
+    kind = rnd.choice(["sorted", "sorted", "shuffled", "swaps"])
+    if kind == "shuffled":
+        rnd.shuffle(rows)
+    elif kind == "swaps" and len(rows) > 1:
+        for _ in range(rnd.randint(1, 1 + len(rows) // 10)):
+            i = rnd.randrange(len(rows) - 1)
+            rows[i], rows[i + 1] = rows[i + 1], rows[i]
+    return kind
+
+
+def to_batch(rows: List[Tuple[int, Tuple[str, int, int, int]]]) -> RecBatch:
+    recs = RecBatch("check")
+    bucket = day_bucketer()
+    for ts, (tier, tier_id, rank_id, lp) in rows:
+        recs.append(ts, bucket.day(ts), tier, lp, round(_calc_score_from_ids(tier_id, rank_id, lp), 2))
+    return recs
+
+
+def columns(recs: RecBatch) -> Columns:
+    return list(zip(recs.ts, recs.day, (recs.tiers[t] for t in recs.tier), recs.lp, recs.score))
+
+
+def _first_diff(a: Columns, b: Columns) -> int:
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return min(len(a), len(b))
+
+
+def check_case(seed: int, case: int, max_rows: int, hits: List[int], rows: Optional[int] = None) -> List[str]:
+    """
+    One generated history against every backend; returns failure lines (empty when equal).
+    rows fixes the history size (NUMPY_MIN_ROWS boundary cases); preprocess("auto") is checked then too.
+    """
+    rnd = random.Random(f"{seed}:{case}")
+    if rows is not None:
+        n = rows
+    else:
+        n = rnd.choice([rnd.randint(0, 3), rnd.randint(0, 40), rnd.randint(0, max_rows)])
+    history = gen_history(rnd, n)
+    order = shuffle_rows(rnd, history)
+    recs = to_batch(history)
+
+    ref_rules = RuleRun("solo")
+    expected = columns(_preprocess_reference(recs, ref_rules))
+    for r, c in enumerate(ref_rules.dropped):
+        hits[r] += c > 0
+
+    backends = dict(BACKENDS)
+    if rows is not None:
+        backends["auto"] = _run_auto
+    failures = []
+    for name, run in backends.items():
+        rules = RuleRun("solo")
+        got = columns(run(recs, rules))
+        where = f"--seed {seed} --case {case}{f' --rows {n}' if rows is not None else ''} ({n} rows, {order}), {name}"
+        if got != expected:
+            i = _first_diff(got, expected)
+            failures.append(f"[FAIL] {where}: 출력 다름 (rows {len(got)} vs {len(expected)}, 첫 차이 #{i}: "
+                            f"{got[i] if i < len(got) else '-'} vs {expected[i] if i < len(expected) else '-'})")
+        elif name not in UNCOUNTED and rules.dropped != ref_rules.dropped:
+            failures.append(f"[FAIL] {where}: 규칙별 제거 수 다름 ({rules.dropped} vs {ref_rules.dropped})")
+        if name == "auto":
+            want = "numpy" if v2.np is not None and n >= NUMPY_MIN_ROWS else "python"
+            if not rules.backend.startswith(want):
+                failures.append(f"[FAIL] {where}: backend {rules.backend} (기대 {want})")
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="preprocess 백엔드들이 _preprocess_reference와 같은 결과를 내는지 무작위 검사")
+    ap.add_argument("--cases", type=int, default=2000, help="무작위 히스토리 수 (기본 2000)")
+    ap.add_argument("--seed", type=int, default=0, help="난수 시드 (기본 0)")
+    ap.add_argument("--case", type=int, default=None, help="이 번호의 히스토리 하나만 검사 (실패 재현용)")
+    ap.add_argument("--rows", type=int, default=None, help="--case와 함께: 히스토리 행 수 고정 (경계 검사 재현용)")
+    ap.add_argument("--max-rows", type=int, default=2000, help="히스토리 최대 행 수 (기본 2000)")
+    args = ap.parse_args()
+    if args.cases < 1 or args.max_rows < 0 or (args.rows is not None and args.rows < 0):
+        raise SystemExit("--cases는 1 이상, --max-rows/--rows는 0 이상이어야 함")
+    if args.rows is not None and args.case is None:
+        raise SystemExit("--rows는 --case와 함께 써야 함")
+    if v2.np is None:
+        print("[SKIP] numpy 없음: _preprocess_numpy 검사 생략")
+
+    hits = [0] * len(RULE_NAMES)
+    failures: List[str] = []
+    if args.case is not None:
+        cases = [(args.case, args.rows)]
+    else:
+        cases = [(c, None) for c in range(args.cases)]
+        cases += [(args.cases + k, NUMPY_MIN_ROWS + k - 1) for k in range(3)]
+    for case, rows in cases:
+        failures += check_case(args.seed, case, args.max_rows, hits, rows)
+
+    for line in failures[:20]:
+        print(line)
+    boundary = [rows for _, rows in cases if rows is not None]
+    print(f"[CHECK] 히스토리 {len(cases)}개, backend {', '.join(BACKENDS)}"
+          f"{' + auto (' + ', '.join(map(str, boundary)) + ' rows)' if boundary else ''}: "
+          f"{'실패 ' + str(len(failures)) + '건' if failures else '모두 일치'}")
+    print("[CHECK] 규칙이 행을 지운 히스토리 수: " + ", ".join(f"{name} {h}" for name, h in zip(RULE_NAMES, hits)))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
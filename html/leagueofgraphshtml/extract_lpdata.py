@@ -11,13 +11,20 @@ import csv
 import json
 import re
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 
 KST = ZoneInfo("Asia/Seoul")
 
+# KST는 1988-10-09 이후 서머타임 없이 UTC+9 고정 -> 그 뒤의 timestamp는 정수 연산으로 날짜 계산
+KST_OFFSET_MS = 9 * 60 * 60 * 1000
+KST_FIXED_SINCE_MS = 592_333_200_000
+DAY_MS = 24 * 60 * 60 * 1000
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 @dataclass
 class Row:
@@ -40,6 +47,20 @@ def extract_title_name(html: str, fallback: str) -> str:
     return (m2.group(1).strip() if m2 else fallback)
 
 
+@lru_cache(maxsize=None)
+def day_to_iso(day: int) -> str:
+    # 같은 날짜 문자열은 한 번만 만듦
+    return date.fromordinal(day).isoformat()
+
+
+def kst_date_str(ts_ms: int) -> str:
+    if ts_ms >= KST_FIXED_SINCE_MS:
+        return day_to_iso((ts_ms + KST_OFFSET_MS) // DAY_MS + EPOCH_ORDINAL)
+    # 그 이전(서머타임 있던 시기)은 zoneinfo로 변환
+    dt = datetime.fromtimestamp(ts_ms / 1000, tz=ZoneInfo("UTC")).astimezone(KST)
+    return dt.date().isoformat()
+
+
 def slice_block(html: str, block_id: str) -> str | None:
     # block_id가 있는 지점부터 다음 rankingHistory- 로 넘어가기 전까지를 블록으로 잡음
     start = html.find(f'id="{block_id}"')
@@ -63,9 +84,7 @@ def build_rows(lp_data: dict, rank_data: dict, name: str) -> list[Row]:
         if not info:
             continue
 
-        ts_ms = int(ts_str)
-        dt = datetime.fromtimestamp(ts_ms / 1000, tz=ZoneInfo("UTC")).astimezone(KST)
-        date_str = dt.date().isoformat()
+        date_str = kst_date_str(int(ts_str))
 
         tier = info.get("tierRankString", "")
         tier_id = int(info.get("tierId", 0))
@@ -8,171 +8,851 @@ Features
 - Extract Solo/Duo (rankingHistory-1) and Flex (rankingHistory-2)
 - Choose queue: --queue solo|flex|both|auto
 - Batch: pass many htmls OR use --in-dir
+- Compressed / bundled inputs: *.html.gz, *.html.zst (optional zstandard), *.zip, *.tar(.gz|.bz2|.xz);
+  pages are decompressed as a stream and reading stops once both blocks' literals are complete
 - Output directory: --out-dir
+- Pages are indexed as raw bytes; only the title and the lpData/rankData literals are decoded
+- --mmap: memory-map each page instead of reading it
+- --stream: read each page in 64 KB chunks and stop once the selected queues' lpData/rankData
+  literals are complete (--queue solo|flex stops after that block; auto/both need both blocks).
+  Reads fewer bytes but scans the literals once more, so plain pages on a local disk are faster
+  without it; compressed inputs are always read this way
+- --jobs N: process files in N worker processes (largest first, log order unchanged)
+- --incremental: skip inputs whose fingerprint matches the out-dir manifest and reuse their CSVs
+- --decoder typed|json: lpData/rankData are decoded straight into typed columns (json.loads + dict walk
+  only as the fallback for unusual literal shapes, or always with --decoder json)
+- --backend python|numpy|auto: how preprocess runs (numpy is optional; auto uses it for long histories)
+- --archive: write a gzip'd sidecar (<page>.lpd.gz: title, block ids, raw lpData/rankData literals,
+  source size/mtime/sha256) next to each page instead of CSVs. Pages with an up-to-date sidecar are
+  read from it, and --in-dir picks up sidecars whose page was deleted
+- --accumulate: merge every saved snapshot of an account (--alias OLD=NEW for renames) into a raw
+  timeline kept in out-dir/.timelines, and write one CSV per account from the combined timeline
+- --profile: wall time, bytes and records per stage (read, index, locate, decode, preprocess, write, ...)
+  per file, printed as an aggregate table at the end; --profile-json PATH also dumps the per-file data
+- --log-jsonl PATH: append one JSON line per file and queue (outcome, reason code, bytes, rows, seconds,
+  worker pid) plus run start/end lines, written from a background thread next to the usual output
+- --worker: stay up and read page paths from stdin (one per line, or NUL-separated with -0), answering
+  each with one JSON line on stdout; log lines go to stderr
+- --rule-stats PATH: rows dropped by each preprocessing rule per history (+ time per rule where the
+  rules run as separate steps: the numpy backend, or --rule-timing), as a JSON report and a summary table
 - Preprocessing:
   1) Remove "Iron IV, 0LP" glitch when same-day has other real tier OR sandwich A->Iron0->A
   2) Remove consecutive duplicate states (tier, lp) to kill season-boundary repeats
-  3) Keep ONLY the last value per day (KST)
+  3) Keep ONLY the last value per day (KST, or --tz)
 
 Usage examples
   python extract_lpdata_daily_last.py *.html --queue flex --out-dir out
   python extract_lpdata_daily_last.py --in-dir . --queue solo --out-dir solo_out
+  python extract_lpdata_daily_last_v2.py --in-dir . --queue both --out-dir out --mmap
+  find . -name '*.html' -print0 | python extract_lpdata_daily_last_v2.py --worker -0 --out-dir out
 
 Notes
-- Works best when lpData/rankData in HTML are JSON-compatible objects (quoted keys).
+- lpData/rankData are parsed as JSON; trailing commas, unquoted keys and single-quoted strings are
+  accepted too (plain JSON still goes through the C scanner).
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
+import gzip
+import hashlib
 import json
+import mmap
+import os
+import queue
 import re
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from datetime import date, datetime, timezone
+from itertools import islice
+from operator import le
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from zoneinfo import ZoneInfo
 
-KST = ZoneInfo("Asia/Seoul")
+try:  # optional: vectorized preprocess backend
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:  # optional: .zst inputs
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
 
 TIER_GROUPS = ["Iron", "Bronze", "Silver", "Gold", "Platinum", "Emerald", "Diamond"]
 DIVS = ["IV", "III", "II", "I"]
 
+LP_VAR_NAMES = ["lpData", "lpdata"]
+RANK_VAR_NAMES = ["rankData", "rankdata"]
+
+# str (decoded page) or a bytes-like buffer (bytes / mmap / bytearray)
+Buffer = Union[str, bytes, bytearray, mmap.mmap]
+
+
+IRON0_TIER = "Iron IV"
+# RecBatch.lp is int32; lpData values outside this range are skipped as unparsable
+LP_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+
+class RecBatch:
+    """
+    One player's records as parallel typed columns (struct of arrays) instead of a list of row objects.
+
+      ts    int64   epoch ms
+      day   int32   local (KST by default) calendar day, date.toordinal()
+      tier  uint16  code into self.tiers (interned tier strings, e.g. "Gold IV")
+      lp    int32   (entries outside LP_RANGE are skipped like unparsable ones)
+      score float32
+
+    name is held once for the whole batch. Rules select rows with take(); all batches derived
+    from one another share the same tiers table, so tier codes compare like tier strings.
+    """
+
+    __slots__ = ("name", "tiers", "_tier_codes", "ts", "day", "tier", "lp", "score")
+
+    def __init__(self, name: str, tiers: Optional[List[str]] = None):
+        self.name = name
+        self.tiers: List[str] = tiers if tiers is not None else []
+        self._tier_codes = {t: i for i, t in enumerate(self.tiers)}
+        self.ts = array("q")
+        self.day = array("i")
+        self.tier = array("H")
+        self.lp = array("i")
+        self.score = array("f")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def tier_code(self, tier: str) -> int:
+        code = self._tier_codes.get(tier)
+        if code is None:
+            code = self._tier_codes[tier] = len(self.tiers)
+            self.tiers.append(tier)
+        return code
+
+    def lookup_tier(self, tier: str) -> int:
+        """Code of an existing tier string, or -1 (never equal to a stored code)."""
+        return self._tier_codes.get(tier, -1)
+
+    def append(self, ts: int, day: int, tier: str, lp: int, score: float) -> None:
+        self.ts.append(ts)
+        self.day.append(day)
+        self.tier.append(self.tier_code(tier))
+        self.lp.append(lp)
+        self.score.append(score)
+
+    def take_np(self, idx: "np.ndarray") -> "RecBatch":
+        """take() for a NumPy index array (columns are gathered without Python-level loops)."""
+        out = RecBatch(self.name, self.tiers)
+        out._tier_codes = self._tier_codes
+        for col in ("ts", "day", "tier", "lp", "score"):
+            src = getattr(self, col)
+            getattr(out, col).frombytes(np.frombuffer(src, dtype=src.typecode)[idx].tobytes())
+        return out
+
+    def take(self, idx: Iterable[int]) -> "RecBatch":
+        """New batch with the rows at idx (in that order); shares the tiers table."""
+        idx = list(idx)
+        out = RecBatch(self.name, self.tiers)
+        out._tier_codes = self._tier_codes
+        for col in ("ts", "day", "tier", "lp", "score"):
+            src = getattr(self, col)
+            getattr(out, col).extend([src[i] for i in idx])
+        return out
+
+
+# -----------------------------
+# Per-stage profile (--profile)
+# -----------------------------
+# Table order; the stages do not nest, so their times add up to the file's processing time.
+#   read: page bytes (or decompressed prefix) read, sidecar: sidecar freshness check / load,
+#   index: page index (title, blocks, assignments), title: name extraction, locate: lpData/rankData
+#   literals sliced and decoded, decode: typed decoder, parse + build: json decoder (json.loads,
+#   _build_records), preprocess, write: CSV, archive: sidecar build + save, accumulate: timeline merges
+PROFILE_STAGES = ["read", "sidecar", "index", "title", "locate", "decode", "parse", "build",
+                  "preprocess", "write", "archive", "accumulate"]
+
 
 @dataclass
-class Rec:
-    ts: int          # epoch ms
-    date: str        # YYYY-MM-DD in KST
-    name: str
-    tier: str        # e.g. "Gold IV"
-    lp: int
-    score: float
+class StageStat:
+    seconds: float = 0.0
+    calls: int = 0
+    bytes: int = 0
+    records: int = 0
+
+
+class _StageTimer:
+    __slots__ = ("stat", "t0")
+
+    def __init__(self, stat: StageStat):
+        self.stat = stat
+
+    def __enter__(self) -> StageStat:
+        self.t0 = time.perf_counter()
+        return self.stat
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stat.seconds += time.perf_counter() - self.t0
+        self.stat.calls += 1
+
+
+class StageProfile:
+    """
+    Wall time, calls, bytes and records per stage of one input file:
+
+        with prof.stage("decode", len(lit)) as st:
+            recs = ...
+            st.records += len(recs)
+
+    Filled in by the process that handled the file and returned on FileResult.profile.
+    Without --profile every function gets NO_PROFILE, whose stage() hands out one shared no-op.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStat] = {}
+
+    def stage(self, name: str, nbytes: int = 0) -> Any:
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = StageStat()
+        st.bytes += nbytes
+        return _StageTimer(st)
+
+    def add(self, other: StageProfile) -> None:
+        for name, o in other.stages.items():
+            st = self.stages.setdefault(name, StageStat())
+            st.seconds += o.seconds
+            st.calls += o.calls
+            st.bytes += o.bytes
+            st.records += o.records
+
+    def total(self) -> float:
+        return sum(st.seconds for st in self.stages.values())
+
+    def to_json(self) -> Dict[str, Dict[str, Any]]:
+        return {name: asdict(st) for name, st in self.stages.items()}
+
+
+class _NoStage:
+    __slots__ = ()
+    scratch = StageStat()  # callers' st.records += ... land here and are never read
+
+    def __enter__(self) -> StageStat:
+        return self.scratch
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+class _NoProfile(StageProfile):
+    enabled = False
+    _stage = _NoStage()
+
+    def stage(self, name: str, nbytes: int = 0) -> Any:
+        return self._stage
+
+
+NO_PROFILE: StageProfile = _NoProfile()
+
+
+def format_profile(files: List[Tuple[Path, StageProfile]], run: StageProfile,
+                   wall: float, jobs: int, slowest: int = 5) -> List[str]:
+    """Aggregate table (+ the slowest files) printed at the end of a --profile run."""
+    agg = StageProfile()
+    for _, prof in files:
+        agg.add(prof)
+    agg.add(run)
+    total = agg.total() or 1e-12
+    lines = [f"[PROFILE] 파일 {len(files)}개 처리, 경과 {wall:.3f} s "
+             f"(단계 합계 {agg.total():.3f} s, --jobs {jobs})",
+             f"{'stage':<11}{'calls':>7}{'time_s':>10}{'%':>7}{'MB':>10}{'MB/s':>9}{'records':>10}"]
+    order = PROFILE_STAGES + sorted(set(agg.stages) - set(PROFILE_STAGES))
+    for name in order:
+        st = agg.stages.get(name)
+        if st is None or not st.calls:
+            continue
+        mb = st.bytes / 1e6
+        rate = f"{mb / st.seconds:9.1f}" if st.bytes and st.seconds > 0 else f"{'-':>9}"
+        lines.append(f"{name:<11}{st.calls:>7}{st.seconds:>10.3f}{100 * st.seconds / total:>7.1f}"
+                     f"{mb:>10.3f}{rate}{st.records if st.records else '-':>10}")
+
+    ranked = sorted(files, key=lambda fp: fp[1].total(), reverse=True)[:slowest]
+    if ranked:
+        lines.append(f"[PROFILE] 가장 느린 파일 {len(ranked)}개")
+    for path, prof in ranked:
+        top = max(prof.stages.items(), key=lambda kv: kv[1].seconds, default=None)
+        where = f" ({top[0]} {100 * top[1].seconds / (prof.total() or 1e-12):.0f}%)" if top else ""
+        lines.append(f"  {prof.total():8.3f} s  {path.name}{where}")
+    return lines
+
+
+def save_profile_json(out: Path, files: List[Tuple[Path, StageProfile]], run: StageProfile,
+                      wall: float, jobs: int) -> None:
+    data = {
+        "wall_seconds": wall,
+        "jobs": jobs,
+        "files": [{"path": str(path), "seconds": prof.total(), "stages": prof.to_json()} for path, prof in files],
+        "run": run.to_json(),  # work not tied to one file (--accumulate flush)
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
 
 
 # -----------------------------
 # JS literal extraction helpers
 # -----------------------------
-def _extract_js_literal(text: str, start_idx: int) -> Tuple[str, int]:
-    """Extract balanced JS literal starting at '[' or '{' (supports nested + strings)."""
-    opener = text[start_idx]
-    if opener not in "[{":
-        raise ValueError("Literal must start with [ or {")
-    closer = "]" if opener == "[" else "}"
-    stack = [closer]
-
-    i = start_idx
-    in_str = False
-    quote = ""
-    escape = False
-
-    while i < len(text):
-        ch = text[i]
-        if in_str:
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == quote:
-                in_str = False
-                quote = ""
-            i += 1
-            continue
+def _literal_token_re(pattern: str, fallback: str) -> Tuple["re.Pattern[str]", "re.Pattern[bytes]"]:
+    try:
+        re.compile(pattern)
+    except re.error:  # possessive quantifiers need Python 3.11+
+        pattern = fallback
+    return re.compile(pattern, re.S), re.compile(pattern.encode("ascii"), re.S)
 
-        if ch in ("'", '"', "`"):
-            in_str = True
-            quote = ch
-            i += 1
-            continue
 
-        if ch in "[{":
-            stack.append("]" if ch == "[" else "}")
-        elif ch in "]}":
-            if not stack or ch != stack[-1]:
-                raise ValueError("Mismatched brackets while scanning JS literal")
+# One match = everything up to (and including) the next bracket outside of strings.
+# Plain text and whole '...' / "..." / `...` strings are consumed inside the regex engine,
+# so the Python loop below only runs once per bracket.
+_LIT_TOKEN_RE, _LIT_TOKEN_RE_B = _literal_token_re(
+    r"""[^\[\]{}"'`]*+(?:"(?:[^"\\]++|\\.)*+"[^\[\]{}"'`]*+|'(?:[^'\\]++|\\.)*+'[^\[\]{}"'`]*+"""
+    r"""|`(?:[^`\\]++|\\.)*+`[^\[\]{}"'`]*+)*+([\[\]{}])""",
+    # no nested unbounded repeats, so a failing match backtracks linearly
+    r"""(?:[^\[\]{}"'`]|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`)*([\[\]{}])""",
+)
+_CLOSERS = {"[": "]", "{": "}", b"[": b"]", b"{": b"}"}
+
+
+def _scan_tokens(text: Buffer, i: int, stack: List[Any], end: int) -> Tuple[Optional[int], int]:
+    """
+    Bracket-to-bracket scan from i with the given stack of expected closers (updated in place).
+    Returns (offset just past the literal, i) once the stack empties, or (None, i) when no further
+    bracket is found before end; i is then where the scan can resume if more text arrives.
+    """
+    match = (_LIT_TOKEN_RE if isinstance(text, str) else _LIT_TOKEN_RE_B).match
+    while True:
+        m = match(text, i, end)
+        if m is None:
+            return None, i
+        i = m.end()
+        ch = m.group(1)
+        closer = _CLOSERS.get(ch)
+        if closer is not None:
+            stack.append(closer)
+        elif ch != stack[-1]:
+            raise ValueError("Mismatched brackets while scanning JS literal")
+        else:
             stack.pop()
             if not stack:
-                return text[start_idx : i + 1], i + 1
-        i += 1
+                return i, i
 
-    raise ValueError("Unterminated JS literal")
 
+def _scan_js_literal(text: Buffer, start_idx: int, end: Optional[int] = None) -> int:
+    """
+    Return the offset just past the balanced JS literal starting at '[' or '{' (supports nested + strings),
+    scanning up to end. Works on str and bytes; jumps from bracket to bracket and copies nothing.
+    """
+    opener = text[start_idx:start_idx + 1]
+    if isinstance(opener, bytearray):
+        opener = bytes(opener)  # growing read buffer (read_page_prefix)
+    if opener not in _CLOSERS:
+        raise ValueError("Literal must start with [ or {")
+    end = len(text) if end is None else end
+
+    done, _ = _scan_tokens(text, start_idx + 1, [_CLOSERS[opener]], end)
+    if done is None:
+        # ran into `end`, or into a string that never closes
+        raise ValueError("Unterminated JS literal")
+    return done
 
-def _find_var_literal(block: str, var_names: List[str]) -> Optional[str]:
+
+def _find_var_literal(buf: Buffer, index: PageIndex, block_id: str, var_names: List[str]) -> Optional[str]:
     """
     Find assignment like 'const lpData = {...};' inside a block and return the '{...}' or '[...]'.
+    The assignment offsets come from the page index; only the literal itself is sliced (and decoded).
 
-    IMPORTANT:
-    Some LeagueOfGraphs pages embed these objects near other JS code. A pure bracket-scan can be thrown off
-    if the parser accidentally enters an unclosed string state. For robustness we first try a simple
-    delimiter-based slice:
+    The balanced scan decides where the literal ends (a '};' inside a string does not cut it short).
+    Some LeagueOfGraphs pages embed these objects near other JS code, and a stray quote can leave the
+    scan in an unclosed string state; only then do we fall back to a delimiter-based slice:
       - object: from first '{' after '=' up to the next '};'
       - array:  from first '[' after '=' up to the next '];'
-    and fall back to balanced scanning if needed.
     """
+    span = index.blocks.get(block_id)
+    if span is None:
+        return None
+    _, end = span
+    text = isinstance(buf, str)
+
     for name in var_names:
-        # allow optional var/let/const, and allow assignments without declarations too
-        m = re.search(rf"(?:var|let|const)?\s*{re.escape(name)}\s*=\s*", block)
-        if not m:
+        after = index.first_assign(buf, block_id, name)
+        if after is None:
             continue
-        after = m.end()
-        m2 = re.search(r"[\[\{]", block[after:])
+        m2 = (_OPENER_RE if text else _OPENER_RE_B).search(buf, after, end)
         if not m2:
             continue
-        start = after + m2.start()
-        opener = block[start]
+        start = m2.start()
+
+        try:
+            return _text(buf, start, _scan_js_literal(buf, start, end))
+        except ValueError:
+            pass
 
-        # Fast path: slice until the first matching close token '};' or '];'
-        close_token = "};" if opener == "{" else "];"
-        endpos = block.find(close_token, start)
+        # Fallback: slice until the first close token '};' or '];'
+        close_token = "};" if buf[start:start + 1] in ("{", b"{") else "];"
+        endpos = buf.find(close_token if text else close_token.encode("ascii"), start, end)
         if endpos != -1:
             # include the closing bracket/brace, exclude the semicolon
-            return block[start:endpos + 1]
-
-        # Fallback: balanced scan
-        try:
-            lit, _ = _extract_js_literal(block, start)
-            return lit
-        except Exception:
-            continue
+            return _text(buf, start, endpos + 1)
     return None
 
 
-def _try_parse_json(lit: str) -> Any:
-    """Parse JSON, with a tiny trailing-comma cleanup."""
-    try:
-        return json.loads(lit)
-    except json.JSONDecodeError:
-        sanitized = re.sub(r",\s*([\]}])", r"\1", lit)
-        return json.loads(sanitized)
+# -----------------------------
+# Tolerant JS literal parsing (JSON plus trailing commas, unquoted keys, single-quoted strings)
+# -----------------------------
+_JSON_SCAN = json.JSONDecoder().scan_once  # C scanner: one complete JSON value at an offset
+_WS_RE = re.compile(r"[ \t\n\r]*")
+# '"key" :' or 'key :' (plus the whitespace after the colon); group 1 still has its escapes
+_MEMBER_KEY_RE = re.compile(r'(?:"((?:[^"\\\x00-\x1f]|\\.)*)"|([A-Za-z_$][\w$]*))[ \t\n\r]*:[ \t\n\r]*', re.S)
+_SEPARATOR_RE = re.compile(r"[ \t\n\r]*(,?)[ \t\n\r]*")
+_SQ_STRING_RE = _literal_token_re(r"'((?:[^'\\]++|\\.)*+)'", r"'((?:[^'\\]|\\.)*)'")[0]
+_SQ_ESCAPE_RE = re.compile(r'\\.|"', re.S)
+_SQ_ESCAPES = {"\\'": "'", '"': '\\"'}  # what changes when '...' is rewritten as "..."
+
+
+def _sq_string(s: str, i: int) -> Tuple[str, int]:
+    """'...' at s[i] -> (value, offset after it); escapes are JSON's plus \\'."""
+    m = _SQ_STRING_RE.match(s, i)
+    if m is None:
+        raise json.JSONDecodeError("Unterminated string", s, i)
+    body = _SQ_ESCAPE_RE.sub(lambda e: _SQ_ESCAPES.get(e.group(), e.group()), m.group(1))
+    return json.decoder.scanstring('"' + body + '"', 1)[0], m.end()
+
+
+class _JsLiteralParser:
+    """
+    Recursive-descent parser for one literal. Whatever is valid JSON is handed to the C scanner whole;
+    only containers that hold a JS-ism (and the path down to them) are walked here:
+      - members before the first JS-ism of a container are parsed by the C scanner as one batch
+        (so a trailing comma costs one extra scan, not a Python walk of every entry)
+      - after the first failed C attempt at a nesting depth, containers at that depth are walked
+        directly (when every rankData entry uses unquoted keys, that is one failed attempt, not one per entry)
+    """
+
+    def __init__(self, s: str):
+        self.s = s
+        self.walk_depths: Set[int] = set()
+        self.ws = _WS_RE.match
+
+    def value(self, i: int, depth: int = 0) -> Tuple[Any, int]:
+        s = self.s
+        ch = s[i:i + 1]
+        if ch == "'":
+            return _sq_string(s, i)
+        err = None
+        if ch not in ("{", "[") or depth not in self.walk_depths:
+            try:
+                return _JSON_SCAN(s, i)
+            except StopIteration:
+                err = i
+            except json.JSONDecodeError as e:
+                err = e.pos
+            if ch not in ("{", "["):
+                raise json.JSONDecodeError("Expecting value", s, i)
+            self.walk_depths.add(depth)
+        return self.obj(i, depth, err) if ch == "{" else self.arr(i, depth, err)
+
+    def _valid_prefix(self, i: int, err: Optional[int], close: str) -> Tuple[Any, int]:
+        """
+        The C scanner read the container at i fine up to err. If err is right after a member's comma,
+        everything before that comma plus the closer is a complete container: parse it in one go and
+        resume the walk at err. Otherwise (or with no err) the walk starts at the opener.
+        """
+        s = self.s
+        if err is not None:
+            c = err
+            while c > i and s[c - 1] in " \t\n\r":
+                c -= 1
+            if c - 1 > i and s[c - 1] == ",":
+                try:
+                    head, end = _JSON_SCAN(s[i:c - 1] + close, 0)
+                except (StopIteration, ValueError):
+                    pass  # err was inside a nested container
+                else:
+                    if end == c - i:
+                        return head, err
+        return ({} if close == "}" else []), self.ws(s, i + 1).end()
+
+    def obj(self, i: int, depth: int, err: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+        s = self.s
+        out, i = self._valid_prefix(i, err, "}")
+        while s[i:i + 1] != "}":
+            m = _MEMBER_KEY_RE.match(s, i)
+            if m is not None:
+                key = m.group(2)
+                if key is None:
+                    key = m.group(1)
+                    if "\\" in key:
+                        key = json.decoder.scanstring(s, i + 1)[0]
+                i = m.end()
+            elif s[i:i + 1] == "'":
+                key, i = _sq_string(s, i)
+                i = self.ws(s, i).end()
+                if s[i:i + 1] != ":":
+                    raise json.JSONDecodeError("Expecting ':' delimiter", s, i)
+                i = self.ws(s, i + 1).end()
+            else:
+                raise json.JSONDecodeError("Expecting property name", s, i)
+            out[key], i = self.value(i, depth + 1)
+            m = _SEPARATOR_RE.match(s, i)
+            i = m.end()
+            if not m.group(1):  # no comma: must be the end (a trailing comma just runs into the '}')
+                if s[i:i + 1] != "}":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", s, i)
+                break
+        return out, i + 1
+
+    def arr(self, i: int, depth: int, err: Optional[int] = None) -> Tuple[List[Any], int]:
+        s = self.s
+        out, i = self._valid_prefix(i, err, "]")
+        while s[i:i + 1] != "]":
+            v, i = self.value(i, depth + 1)
+            out.append(v)
+            m = _SEPARATOR_RE.match(s, i)
+            i = m.end()
+            if not m.group(1):
+                if s[i:i + 1] != "]":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", s, i)
+                break
+        return out, i + 1
+
+
+def _parse_js_literal(lit: str) -> Any:
+    """
+    Parse an lpData/rankData literal in one pass: plain JSON at C speed, plus the JS-isms some pages
+    carry (trailing commas, unquoted keys, single-quoted strings). Raises ValueError otherwise.
+    """
+    ws = _WS_RE.match
+    value, i = _JsLiteralParser(lit).value(ws(lit).end())
+    if ws(lit, i).end() != len(lit):
+        raise json.JSONDecodeError("Extra data", lit, i)
+    return value
 
 
 # -----------------------------
-# HTML slicing: solo/flex blocks
+# Typed decoding of lpData/rankData (no dict-of-dicts)
 # -----------------------------
-def _slice_block(html: str, block_id: str) -> Optional[str]:
-    start = html.find(f'id="{block_id}"')
-    if start == -1:
+# One rankData entry body (between '"<ts>":{' and '}'): the members iter_raw_rows reads, in the
+# order the site writes them, then any other scalar members. Integers and strings are strict JSON
+# without escapes, and none of the members read by iter_raw_rows may repeat, so the raw text decodes
+# exactly as json.loads would.
+_RANK_BODY_RE = _literal_token_re(
+    r'"tierId":(0|[1-9]\d*+),"rankId":(0|[1-9]\d*+),(?:"rankStr":"[^"\\\x00-\x1f]*+",)?'
+    r'"tierRankString":"([^"\\\x00-\x1f]*+)"'
+    r'(?:,"(?!(?:tierId|rankId|tierRankString|rankString)")\w++":'
+    r'(?:"(?:[^"\\\x00-\x1f]++|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*+"|-?(?:0|[1-9]\d*+)(?:\.\d++)?+|true|false|null))*+',
+    r'"tierId":(0|[1-9]\d*),"rankId":(0|[1-9]\d*),(?:"rankStr":"[^"\\\x00-\x1f]*",)?'
+    r'"tierRankString":"([^"\\\x00-\x1f]*)"'
+    r'(?:,"(?!(?:tierId|rankId|tierRankString|rankString)")\w+":'
+    r'(?:"(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*"|-?(?:0|[1-9]\d*)(?:\.\d+)?|true|false|null))*',
+)[0]
+
+
+def _decode_lp_literal(lit: str) -> Optional[Tuple[List[str], array, array]]:
+    """
+    lpData -> (ts keys, ts int64, lp int32) in literal order, or None if any entry is not a plain
+    integer inside LP_RANGE. The flat map itself goes through _parse_js_literal (the C json scanner for plain JSON,
+    which a Python tokenizer cannot beat);
+    only the per-entry int(float(...)) walk is replaced by bulk array conversion.
+    """
+    try:
+        data = _parse_js_literal(lit)
+        if not isinstance(data, dict):
+            return None
+        keys = list(data)
+        return keys, array("q", map(int, keys)), array("i", data.values())
+    except (ValueError, TypeError, OverflowError):  # not strict JSON / non-integer keys or values
+        return None
+
+
+def _decode_rank_literal(lit: str) -> Optional[Tuple[Dict[str, int], array, array, List[str]]]:
+    """
+    rankData -> ({ts key: entry}, tierId int8, rankId int8, tier strings) where entry indexes the three
+    parallel per-entry columns, or None if the literal is not in the usual shape.
+
+    Snapshots repeat the same few entry bodies (one per tier/rank, each carrying the same <img> markup),
+    so the literal is split on the '},"' entry boundary, which cannot occur inside a valid JSON string,
+    and every distinct body is validated and decoded once.
+    """
+    if lit == "{}":
+        return {}, array("b"), array("b"), []
+    if not (lit.startswith('{"') and lit.endswith("}}")):
+        return None
+
+    keys: List[str] = []
+    refs = array("H")
+    tier_ids, rank_ids = array("b"), array("b")
+    tiers: List[str] = []
+    seen: Dict[str, int] = {}
+    try:
+        for piece in lit[2:-2].split('},"'):
+            key, sep, body = piece.partition('":{')
+            ref = seen.get(body)
+            if ref is None:
+                m = _RANK_BODY_RE.fullmatch(body)
+                if not sep or m is None:
+                    return None
+                ref = seen[body] = len(tiers)
+                tier_ids.append(int(m.group(1)))
+                rank_ids.append(int(m.group(2)))
+                tiers.append(m.group(3).strip())
+            keys.append(key)
+            refs.append(ref)
+    except OverflowError:  # ids outside int8 / more than 65535 distinct bodies
+        return None
+    if not "".join(keys).isdigit():
+        return None  # keys with escapes (or anything else odd): let json decode them
+    # Later duplicates win, as in json.loads.
+    return dict(zip(keys, refs)), tier_ids, rank_ids, tiers
+
+
+def _decode_typed(lp_lit: str, rank_lit: str, name: str, tz: str = "Asia/Seoul") -> Optional[RecBatch]:
+    """
+    Same rows as _build_records(json.loads(lp), json.loads(rank)) for the usual literal shapes,
+    decoded straight into columns; None means "use the json path".
+    """
+    lp_cols = _decode_lp_literal(lp_lit)
+    if lp_cols is None:
         return None
-    nxt = html.find('id="rankingHistory-', start + 1)
-    return html[start:nxt] if nxt != -1 else html[start:]
+    rank_cols = _decode_rank_literal(rank_lit)
+    if rank_cols is None:
+        return None
+    lp_keys, lp_ts, lp_val = lp_cols
+    entry_of, tier_ids, rank_ids, tiers = rank_cols
+
+    recs = RecBatch(name)
+    tier_code = recs.tier_code
+    # Per entry: tier code (interned in first-use order, as _build_records) and score without LP, or
+    # None for entries that iter_raw_rows skips.
+    usable: List[Optional[Tuple[int, float]]] = [None] * len(tiers)
+    for e, tier in enumerate(tiers):
+        tid, rid = tier_ids[e], rank_ids[e]
+        if tier and tid != 0 and rid != 0:
+            usable[e] = (-1, _calc_score_from_ids(tid, rid, 0))
+
+    ts_col, tier_col, lp_col, score_col = recs.ts, recs.tier, recs.lp, recs.score
+    for i, e in enumerate(map(entry_of.get, lp_keys)):
+        if e is None:
+            continue
+        u = usable[e]
+        if u is None:
+            continue
+        code, base = u
+        if code < 0:
+            code = tier_code(tiers[e])
+            usable[e] = (code, base)
+        lp = lp_val[i]
+        ts_col.append(lp_ts[i])
+        tier_col.append(code)
+        lp_col.append(lp)
+        score_col.append(round(base + lp / 100.0, 2))
+
+    recs.day = day_bucketer(tz).days(ts_col)
+    return _sort_by_ts(recs)
+
+
+# -----------------------------
+# Page index: title, solo/flex blocks, lpData/rankData assignments
+# -----------------------------
+_TITLE_RE = re.compile(r"<title>\s*(.*?)\s*-\s*LeagueOfGraphs\s*</title>", re.I)
+_TITLE_RE_B = re.compile(rb"<title>\s*(.*?)\s*-\s*LeagueOfGraphs\s*</title>", re.I)
+_BLOCK_MARKER = 'id="rankingHistory-'
+_BLOCK_NUM_RE = re.compile(r'(\d+)"')
+_BLOCK_NUM_RE_B = re.compile(rb'(\d+)"')
+# every wanted variable ends in "ata"; a literal prefix keeps the regex on its fast search path
+_ASSIGN_RE = re.compile(r"ata\s*=\s*")
+_ASSIGN_RE_B = re.compile(rb"ata\s*=\s*")
+_OPENER_RE = re.compile(r"[\[\{]")
+_OPENER_RE_B = re.compile(rb"[\[\{]")
+_ALL_VAR_NAMES = LP_VAR_NAMES + RANK_VAR_NAMES
+
+
+@dataclass
+class PageIndex:
+    """
+    Offsets of everything extraction reads, collected in one forward sweep over the page.
+
+    title:   span of the <title> text (group 1 of _TITLE_RE)
+    blocks:  "rankingHistory-N" -> (start, end), end = next block marker or EOF (first occurrence wins)
+    assigns: "rankingHistory-N" -> [(var name, offset right after '=')] in page order
+    resume:  blocks whose assignment scan stopped early -> offset to continue from
+    """
+    size: int
+    title: Optional[Tuple[int, int]]
+    blocks: Dict[str, Tuple[int, int]]
+    assigns: Dict[str, List[Tuple[str, int]]]
+    resume: Dict[str, int]
+
+    def first_assign(self, buf: Buffer, block_id: str, name: str) -> Optional[int]:
+        found = self.assigns.get(block_id, [])
+        for n, after in found:
+            if n == name:
+                return after
+        # rare: the preferred names did not yield a literal; scan the rest of the block once
+        pos = self.resume.pop(block_id, None)
+        if pos is None:
+            return None
+        more, _ = _scan_assigns(buf, pos, self.blocks[block_id][1], stop_early=False)
+        found.extend(more)
+        return self.first_assign(buf, block_id, name)
+
+
+def _text(buf: Buffer, start: int, end: int) -> str:
+    """buf[start:end] as str; raw buffers are decoded straight from a memoryview (no bytes copy)."""
+    if isinstance(buf, str):
+        return buf[start:end]
+    with memoryview(buf) as mv:
+        return str(mv[start:end], "utf-8", "ignore")
+
+
+def _scan_assigns(buf: Buffer, start: int, end: int, stop_early: bool = True) -> Tuple[List[Tuple[str, int]], Optional[int]]:
+    """
+    lpData/rankData assignments in buf[start:end].
+    With stop_early the scan ends once both preferred names are seen and returns where to resume.
+    """
+    text = isinstance(buf, str)
+    names = [(n, n if text else n.encode("ascii")) for n in _ALL_VAR_NAMES]
+    found: List[Tuple[str, int]] = []
+    seen = set()
+    for m in (_ASSIGN_RE if text else _ASSIGN_RE_B).finditer(buf, start, end):
+        tail = m.start() + 3
+        for name, needle in names:
+            head = tail - len(needle)
+            if head >= start and buf[head:tail] == needle:
+                found.append((name, m.end()))
+                seen.add(name)
+                break
+        if stop_early and LP_VAR_NAMES[0] in seen and RANK_VAR_NAMES[0] in seen:
+            return found, m.end()
+    return found, None
+
+
+def index_page(buf: Buffer) -> PageIndex:
+    """
+    Index a decoded page (str) or raw page bytes (bytes/mmap).
+    Block markers are found with a forward find() chain and assignments are only searched inside
+    blocks, so no part of the page is rescanned for the same thing.
+    """
+    text = isinstance(buf, str)
+    size = len(buf)
+
+    m = (_TITLE_RE if text else _TITLE_RE_B).search(buf)
+    title = m.span(1) if m else None
+
+    marker = _BLOCK_MARKER if text else _BLOCK_MARKER.encode("ascii")
+    num_re = _BLOCK_NUM_RE if text else _BLOCK_NUM_RE_B
+    markers: List[Tuple[int, Optional[str]]] = []
+    pos = buf.find(marker)
+    while pos != -1:
+        mn = num_re.match(buf, pos + len(marker))
+        num = mn.group(1) if mn else None
+        markers.append((pos, num if (num is None or text) else num.decode("ascii")))
+        pos = buf.find(marker, pos + 1)
+
+    blocks: Dict[str, Tuple[int, int]] = {}
+    assigns: Dict[str, List[Tuple[str, int]]] = {}
+    resume: Dict[str, int] = {}
+    for k, (start, num) in enumerate(markers):
+        block_id = f"rankingHistory-{num}"
+        if num is None or block_id in blocks:
+            continue
+        end = markers[k + 1][0] if k + 1 < len(markers) else size
+        blocks[block_id] = (start, end)
+        assigns[block_id], pos = _scan_assigns(buf, start, end)
+        if pos is not None:
+            resume[block_id] = pos
+
+    return PageIndex(size=size, title=title, blocks=blocks, assigns=assigns, resume=resume)
+
+
+def _clean_title(title: str) -> str:
+    title = title.strip()
+    return re.sub(r"\s*\(KR\)\s*$", "", title).strip()
 
 
-def _extract_name(html: str, fallback_filename: str) -> str:
-    m = re.search(r"<title>\s*(.*?)\s*-\s*LeagueOfGraphs\s*</title>", html, re.I)
-    if m:
-        title = m.group(1).strip()
-        title = re.sub(r"\s*\(KR\)\s*$", "", title).strip()
-        return title
+def _extract_name(html: Buffer, fallback_filename: str, index: Optional[PageIndex] = None) -> str:
+    if index is None:
+        m = (_TITLE_RE if isinstance(html, str) else _TITLE_RE_B).search(html)
+        title = m.span(1) if m else None
+    else:
+        title = index.title
+    if title is not None:
+        return _clean_title(_text(html, *title))
+    return _name_from_filename(fallback_filename)
+
+
+def _name_from_filename(fallback_filename: str) -> str:
     base = Path(fallback_filename).stem
     base = re.sub(r"\s*-\s*LeagueOfGraphs.*$", "", base).strip()
     base = re.sub(r"\s*\(KR\)\s*$", "", base).strip()
     return base or "unknown#unknown"
 
 
-def _ts_to_kst_date(ts_ms: int) -> str:
-    dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).astimezone(KST)
-    return dt.date().isoformat()
+MS_PER_DAY = 86_400_000
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# zone -> (UTC offset in ms, epoch ms from which that offset never changes; None = always)
+_FIXED_OFFSET_ZONES: Dict[str, Tuple[int, Optional[int]]] = {
+    "Asia/Seoul": (9 * 3_600_000, 592_333_200_000),  # last DST ended 1988-10-09 03:00 KDT
+    "UTC": (0, None),
+}
+
+
+class DayBucketer:
+    """
+    Epoch ms -> local calendar day number (date.toordinal()) for one time zone.
+    Zones with a known fixed UTC offset (KST since 1988) are plain integer arithmetic;
+    other zones, and timestamps before the fixed range, go through zoneinfo one value at a time.
+    """
+
+    def __init__(self, tz_name: str = "Asia/Seoul"):
+        self.tz_name = tz_name
+        self.tz = ZoneInfo(tz_name)
+        self._offset_ms, self._fixed_from = _FIXED_OFFSET_ZONES.get(tz_name, (None, None))
+
+    def _zoneinfo_day(self, ts_ms: int) -> int:
+        dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).astimezone(self.tz)
+        return dt.date().toordinal()
+
+    def day(self, ts_ms: int) -> int:
+        if self._offset_ms is not None and (self._fixed_from is None or ts_ms >= self._fixed_from):
+            return (ts_ms + self._offset_ms) // MS_PER_DAY + _EPOCH_ORDINAL
+        return self._zoneinfo_day(ts_ms)
+
+    def days(self, ts: Iterable[int]) -> "array[int]":
+        """day() for a whole column."""
+        ts = ts if isinstance(ts, array) else array("q", ts)
+        if self._offset_ms is not None and ts and (self._fixed_from is None or min(ts) >= self._fixed_from):
+            off, base = self._offset_ms, _EPOCH_ORDINAL
+            return array("i", [(t + off) // MS_PER_DAY + base for t in ts])
+        return array("i", map(self.day, ts))
+
+
+@lru_cache(maxsize=None)
+def day_bucketer(tz_name: str = "Asia/Seoul") -> DayBucketer:
+    return DayBucketer(tz_name)
+
+
+def _day_to_iso(day: int) -> str:
+    return date.fromordinal(day).isoformat()
 
 
 def _calc_score_from_ids(tier_id: int, rank_id: int, lp: int) -> float:
@@ -180,8 +860,11 @@ def _calc_score_from_ids(tier_id: int, rank_id: int, lp: int) -> float:
     return (tier_id - 1) * 4 + (4 - rank_id) + (lp / 100.0)
 
 
-def _build_records(lp_data: Dict[str, Any], rank_data: Dict[str, Any], name: str) -> List[Rec]:
-    recs: List[Rec] = []
+def iter_raw_rows(lp_data: Dict[str, Any], rank_data: Dict[str, Any]) -> Iterator[Tuple[int, str, int, int, int]]:
+    """
+    (ts, tier, tier_id, rank_id, lp) for every usable lpData entry, in lpData order, before any
+    preprocessing (entries without rankData, tier string or tier/rank ids are skipped).
+    """
     for ts_str, lp_val in lp_data.items():
         if ts_str not in rank_data:
             continue
@@ -190,6 +873,8 @@ def _build_records(lp_data: Dict[str, Any], rank_data: Dict[str, Any], name: str
             lp = int(float(lp_val))
         except Exception:
             continue
+        if not LP_RANGE[0] <= lp <= LP_RANGE[1]:
+            continue  # does not fit the lp column
 
         info = rank_data.get(ts_str, {})
         tier = (info.get("tierRankString") or info.get("rankString") or "").strip()
@@ -203,142 +888,975 @@ def _build_records(lp_data: Dict[str, Any], rank_data: Dict[str, Any], name: str
 
         if not tier or tier_id == 0 or rank_id == 0:
             continue
+        yield ts, tier, tier_id, rank_id, lp
 
-        score = round(_calc_score_from_ids(tier_id, rank_id, lp), 2)
-        date = _ts_to_kst_date(ts)
-        recs.append(Rec(ts=ts, date=date, name=name, tier=tier, lp=lp, score=score))
 
-    recs.sort(key=lambda r: r.ts)
-    return recs
+def _build_records(lp_data: Dict[str, Any], rank_data: Dict[str, Any], name: str,
+                   tz: str = "Asia/Seoul") -> RecBatch:
+    recs = RecBatch(name)
+    ts_col, tier_col, lp_col, score_col = recs.ts, recs.tier, recs.lp, recs.score
+    for ts, tier, tier_id, rank_id, lp in iter_raw_rows(lp_data, rank_data):
+        ts_col.append(ts)
+        tier_col.append(recs.tier_code(tier))
+        lp_col.append(lp)
+        score_col.append(round(_calc_score_from_ids(tier_id, rank_id, lp), 2))
+
+    recs.day = day_bucketer(tz).days(ts_col)
+    return _sort_by_ts(recs)
+
+
+def _sort_by_ts(recs: RecBatch) -> RecBatch:
+    ts = recs.ts
+    if all(map(le, ts, islice(ts, 1, None))):
+        return recs  # already ordered (the usual case for lpData)
+    return recs.take(sorted(range(len(recs)), key=ts.__getitem__))
 
 
 # -----------------------------
 # Preprocessing rules
 # -----------------------------
-def _remove_iron0_same_day_glitch(recs: List[Rec]) -> List[Rec]:
+def _iron0_mask(recs: RecBatch) -> List[bool]:
+    iron = recs.lookup_tier(IRON0_TIER)
+    return [t == iron and lp == 0 for t, lp in zip(recs.tier, recs.lp)]
+
+
+def _remove_iron0_same_day_glitch(recs: RecBatch) -> RecBatch:
     """
     If a day has any non-(Iron IV,0) record, drop all (Iron IV,0) for that day.
     """
     if not recs:
         return recs
-    by_date: Dict[str, List[int]] = {}
-    for i, r in enumerate(recs):
-        by_date.setdefault(r.date, []).append(i)
-
-    drop = set()
-    for d, idxs in by_date.items():
-        has_non_iron0 = any(not (recs[i].tier == "Iron IV" and recs[i].lp == 0) for i in idxs)
-        if has_non_iron0:
-            for i in idxs:
-                if recs[i].tier == "Iron IV" and recs[i].lp == 0:
-                    drop.add(i)
-    return [r for i, r in enumerate(recs) if i not in drop]
+    iron0 = _iron0_mask(recs)
+    real_days = {d for d, g in zip(recs.day, iron0) if not g}
+    return recs.take(i for i, (d, g) in enumerate(zip(recs.day, iron0)) if not (g and d in real_days))
 
 
-def _remove_consecutive_duplicates(recs: List[Rec]) -> List[Rec]:
+def _remove_consecutive_duplicates(recs: RecBatch) -> RecBatch:
     """Remove consecutive duplicate states (tier, lp)."""
     if not recs:
         return recs
-    out = [recs[0]]
-    for r in recs[1:]:
-        p = out[-1]
-        if (r.tier, r.lp) == (p.tier, p.lp):
+    tier, lp = recs.tier, recs.lp
+    keep = [0]
+    for i in range(1, len(recs)):
+        p = keep[-1]
+        if tier[i] == tier[p] and lp[i] == lp[p]:
             continue
-        out.append(r)
-    return out
+        keep.append(i)
+    return recs.take(keep)
 
 
-def _remove_iron0_sandwich(recs: List[Rec]) -> List[Rec]:
+def _remove_iron0_sandwich(recs: RecBatch) -> RecBatch:
     """Remove pattern A -> (Iron IV,0) -> A (same state on both sides), anywhere."""
-    if len(recs) < 3:
+    n = len(recs)
+    if n < 3:
         return recs
-    out: List[Rec] = []
-    i = 0
-    while i < len(recs):
-        if 0 < i < len(recs) - 1:
-            mid = recs[i]
-            if mid.tier == "Iron IV" and mid.lp == 0:
-                left = recs[i - 1]
-                right = recs[i + 1]
-                if (left.tier, left.lp) == (right.tier, right.lp):
-                    i += 1
-                    continue
-        out.append(recs[i])
-        i += 1
-    return out
+    tier, lp = recs.tier, recs.lp
+    iron0 = _iron0_mask(recs)
+    keep = [
+        i for i in range(n)
+        if not (0 < i < n - 1 and iron0[i] and tier[i - 1] == tier[i + 1] and lp[i - 1] == lp[i + 1])
+    ]
+    return recs.take(keep)
 
 
-def _keep_last_per_day(recs: List[Rec]) -> List[Rec]:
+def _keep_last_per_day(recs: RecBatch) -> RecBatch:
     """Keep only the last record per day (KST), based on ts order."""
-    last: Dict[str, Rec] = {}
-    for r in recs:
-        last[r.date] = r
-    return [last[d] for d in sorted(last.keys())]
+    last: Dict[int, int] = {}
+    for i, d in enumerate(recs.day):
+        last[d] = i
+    return recs.take(last[d] for d in sorted(last))
+
+
+PREPROCESS_RULES: Tuple[Tuple[str, Callable[[RecBatch], RecBatch]], ...] = (
+    ("iron0_same_day_glitch", _remove_iron0_same_day_glitch),
+    ("consecutive_duplicates", _remove_consecutive_duplicates),
+    ("iron0_sandwich", _remove_iron0_sandwich),
+    ("keep_last_per_day", _keep_last_per_day),
+)
+RULE_NAMES = [name for name, _ in PREPROCESS_RULES]
+
+
+@dataclass
+class RuleRun:
+    """Rows dropped (and seconds spent) per rule by one preprocess() call, in PREPROCESS_RULES order."""
+    queue: str
+    timed: bool = False                   # --rule-timing: run the rules as separate passes
+    name: str = ""
+    backend: str = ""
+    rows_in: int = 0
+    rows_out: int = 0
+    seconds: float = 0.0
+    dropped: List[int] = field(default_factory=lambda: [0] * len(PREPROCESS_RULES))
+    rule_seconds: Optional[List[float]] = None  # only where the rules run as separate steps
+
+
+class RuleStats:
+    """
+    Per-history rule accounting for --rule-stats. Callers hand preprocess() a fresh entry:
 
+        recs = preprocess(raw, backend, stats.new(q) if stats else None)
 
-def preprocess(recs: List[Rec]) -> List[Rec]:
+    The fused Python pass only counts (a few integer increments in its loop); per-rule seconds come
+    from the NumPy backend, whose rules are separate array steps, or from --rule-timing, which runs
+    the Python rules one pass at a time (same output, slower).
+    """
+
+    def __init__(self, timed: bool = False) -> None:
+        self.timed = timed
+        self.runs: List[RuleRun] = []
+
+    def new(self, queue: str) -> RuleRun:
+        run = RuleRun(queue, self.timed)
+        self.runs.append(run)
+        return run
+
+
+def _rule_totals(runs: Iterable[RuleRun]) -> Dict[str, Any]:
+    totals: Dict[str, Any] = {"histories": 0, "rows_in": 0, "rows_out": 0, "seconds": 0.0, "rules": {}}
+    per_rule = [{"dropped": 0, "histories": 0, "seconds": 0.0, "timed_histories": 0} for _ in RULE_NAMES]
+    for run in runs:
+        totals["histories"] += 1
+        totals["rows_in"] += run.rows_in
+        totals["rows_out"] += run.rows_out
+        totals["seconds"] += run.seconds
+        for r, c in enumerate(run.dropped):
+            per_rule[r]["dropped"] += c
+            per_rule[r]["histories"] += c > 0
+            if run.rule_seconds is not None:
+                per_rule[r]["seconds"] += run.rule_seconds[r]
+                per_rule[r]["timed_histories"] += 1
+    totals["rules"] = dict(zip(RULE_NAMES, per_rule))
+    return totals
+
+
+def format_rule_stats(files: List[Tuple[Path, RuleStats]], run: Optional[RuleStats]) -> List[str]:
+    """Table printed at the end of a --rule-stats run: rows dropped and time per rule."""
+    runs = [r for _, st in files for r in st.runs] + (run.runs if run else [])
+    tot = _rule_totals(runs)
+    rows_in = tot["rows_in"] or 1
+    lines = [f"[RULES] 히스토리 {tot['histories']}개, {tot['rows_in']} rows -> {tot['rows_out']} rows "
+             f"(전처리 {tot['seconds']:.3f} s)",
+             f"{'rule':<24}{'dropped':>10}{'%':>7}{'histories':>11}{'time_s':>10}"]
+    for name, st in tot["rules"].items():
+        secs = f"{st['seconds']:>10.3f}" if st["timed_histories"] else f"{'-':>10}"
+        lines.append(f"{name:<24}{st['dropped']:>10}{100 * st['dropped'] / rows_in:>7.1f}{st['histories']:>11}{secs}")
+    if any(r.rule_seconds is None for r in runs):
+        lines.append("[RULES] time_s는 규칙별로 따로 도는 경우(numpy, --rule-timing)만 집계됨")
+    return lines
+
+
+def save_rule_stats_json(out: Path, files: List[Tuple[Path, RuleStats]], run: Optional[RuleStats],
+                         wall: float) -> None:
+    runs = [(str(path), r) for path, st in files for r in st.runs] + [("", r) for r in (run.runs if run else [])]
+    data = {
+        "wall_seconds": wall,
+        "rules": RULE_NAMES,
+        "totals": _rule_totals(r for _, r in runs),
+        "histories": [
+            {"path": path, "name": r.name, "queue": r.queue, "backend": r.backend, "rows_in": r.rows_in,
+             "rows_out": r.rows_out, "seconds": r.seconds, "dropped": dict(zip(RULE_NAMES, r.dropped)),
+             "rule_seconds": None if r.rule_seconds is None else dict(zip(RULE_NAMES, r.rule_seconds))}
+            for path, r in runs  # path "" = --accumulate timeline
+        ],
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def _preprocess_reference(recs: RecBatch, rules: Optional[RuleRun] = None) -> RecBatch:
+    """The rules one pass at a time; preprocess() must produce exactly this."""
+    recs = _sort_by_ts(recs)
+    if rules is not None:
+        rules.rule_seconds = [0.0] * len(PREPROCESS_RULES)
+    for i, (_, rule) in enumerate(PREPROCESS_RULES):
+        n = len(recs)
+        t0 = time.perf_counter()
+        recs = rule(recs)
+        if rules is not None:
+            rules.rule_seconds[i] += time.perf_counter() - t0
+            rules.dropped[i] += n - len(recs)
+    return recs
+
+
+# histories shorter than this are cheaper in pure Python than the NumPy call overhead
+NUMPY_MIN_ROWS = 5000
+
+
+def _preprocess_numpy(recs: RecBatch, rules: Optional[RuleRun] = None) -> RecBatch:
+    """
+    preprocess() as array operations: masks, shifted comparisons and day boundaries.
+    Same output as _preprocess_reference().
+    """
+    n = len(recs)
+    if n == 0:
+        return recs
+    clock = time.perf_counter
+    marks = [clock()]  # start, then the end of each rule (only read with rules)
+    ts = np.frombuffer(recs.ts, dtype=np.int64)
+    if n > 1 and not (ts[1:] >= ts[:-1]).all():
+        recs = recs.take_np(np.argsort(ts, kind="stable"))
+    day = np.frombuffer(recs.day, dtype=recs.day.typecode)
+    tier = np.frombuffer(recs.tier, dtype=recs.tier.typecode)
+    lp = np.frombuffer(recs.lp, dtype=recs.lp.typecode)
+    iron0 = (tier == recs.lookup_tier(IRON0_TIER)) & (lp == 0)
+
+    # 1) same-day glitch: days are contiguous runs; a day is "real" if any row is not Iron0
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    real_day = np.add.reduceat((~iron0).astype(np.int32), starts) > 0
+    has_real = np.repeat(real_day, np.diff(np.r_[starts, n]))
+    idx = np.flatnonzero(~(iron0 & has_real))
+    sizes = [n, len(idx)]
+    marks.append(clock())
+
+    # 2) consecutive duplicates of (tier, lp)
+    t, p = tier[idx], lp[idx]
+    idx = idx[np.r_[True, (t[1:] != t[:-1]) | (p[1:] != p[:-1])]]
+    sizes.append(len(idx))
+    marks.append(clock())
+
+    # 3) A -> Iron0 -> A sandwiches (neighbours taken from rule 2's output)
+    if len(idx) >= 3:
+        t, p = tier[idx], lp[idx]
+        mid = iron0[idx][1:-1] & (t[:-2] == t[2:]) & (p[:-2] == p[2:])
+        idx = idx[~np.r_[False, mid, False]]
+    sizes.append(len(idx))
+    marks.append(clock())
+
+    # 4) last row of each day
+    d = day[idx]
+    idx = idx[np.r_[d[1:] != d[:-1], True]]
+    sizes.append(len(idx))
+    marks.append(clock())
+
+    if rules is not None:
+        rules.dropped = [a - b for a, b in zip(sizes, sizes[1:])]
+        rules.rule_seconds = [b - a for a, b in zip(marks, marks[1:])]
+    return recs.take_np(idx)
+
+
+def _use_numpy(backend: str, n: int) -> bool:
+    if backend == "numpy":
+        return True
+    return backend == "auto" and np is not None and n >= NUMPY_MIN_ROWS
+
+
+def preprocess(recs: RecBatch, backend: str = "auto", rules: Optional[RuleRun] = None) -> RecBatch:
     """
     Pipeline:
-      0) sort by ts
+      0) sort by ts (skipped when already ordered)
       1) remove Iron0 glitch if same-day has any real tier
       2) remove consecutive duplicates (season-boundary duplicates, etc.)
       3) remove sandwich Iron0
       4) keep only last per day
+
+    All four rules run fused in one pass over the sorted rows. Rule 1 looks at one day at a time,
+    rule 3 holds back one row until its right neighbour (in rule 2's output) is known, and rule 4
+    holds the latest row of the current day. Same output as _preprocess_reference().
+
+    backend: "python", "numpy" (_preprocess_numpy) or "auto" (numpy for long histories, if installed).
+    rules: filled with the rows each rule dropped (see RuleStats).
     """
-    recs = sorted(recs, key=lambda r: r.ts)
-    recs = _remove_iron0_same_day_glitch(recs)
-    recs = _remove_consecutive_duplicates(recs)
-    recs = _remove_iron0_sandwich(recs)
-    recs = _keep_last_per_day(recs)
-    return recs
+    if rules is None:
+        return _preprocess(recs, backend)
+    t0 = time.perf_counter()
+    rules.name, rules.rows_in = recs.name, len(recs)
+    if _use_numpy(backend, len(recs)):
+        rules.backend = "numpy"
+        out = _preprocess_numpy(recs, rules)
+    elif rules.timed:
+        rules.backend = "python-staged"
+        out = _preprocess_reference(recs, rules)
+    else:
+        rules.backend = "python"
+        out = _preprocess(recs, backend, rules.dropped)
+    rules.rows_out = len(out)
+    rules.seconds = time.perf_counter() - t0
+    return out
+
+
+def _preprocess(recs: RecBatch, backend: str, dropped: Optional[List[int]] = None) -> RecBatch:
+    """preprocess() without accounting; dropped (if given) gets the fused pass's per-rule counts."""
+    if _use_numpy(backend, len(recs)):
+        return _preprocess_numpy(recs)
+
+    recs = _sort_by_ts(recs)
+    n = len(recs)
+    if n == 0:
+        return recs
+    day, tier, lp = recs.day, recs.tier, recs.lp
+    iron = recs.lookup_tier(IRON0_TIER)
+
+    keep: List[int] = []
+    last2 = -1            # last row kept by rule 2
+    prev3 = cur3 = -1     # rule 3 window: rule-2 rows before the incoming one
+    last4 = -1            # rule 4: latest surviving row of the current day
+    drop1 = drop2 = drop3 = 0
+
+    i = 0
+    while i < n:
+        d = day[i]
+        j = i
+        has_real = False
+        while j < n and day[j] == d:
+            if tier[j] != iron or lp[j] != 0:
+                has_real = True
+            j += 1
+
+        for k in range(i, j):
+            t, p = tier[k], lp[k]
+            if has_real and t == iron and p == 0:
+                drop1 += 1
+                continue  # rule 1
+            if last2 >= 0 and t == tier[last2] and p == lp[last2]:
+                drop2 += 1
+                continue  # rule 2
+            last2 = k
+
+            # rule 3 for cur3, now that its right neighbour k is known
+            if cur3 >= 0:
+                if (prev3 >= 0 and tier[cur3] == iron and lp[cur3] == 0
+                        and tier[prev3] == t and lp[prev3] == p):
+                    drop3 += 1
+                else:
+                    if last4 >= 0 and day[last4] != day[cur3]:
+                        keep.append(last4)  # rule 4: day of last4 is complete
+                    last4 = cur3
+            prev3, cur3 = cur3, k
+        i = j
+
+    # the final rule-2 row has no right neighbour, so rule 3 always keeps it
+    if cur3 >= 0:
+        if last4 >= 0 and day[last4] != day[cur3]:
+            keep.append(last4)
+        last4 = cur3
+    keep.append(last4)
+    if dropped is not None:
+        for r, c in enumerate((drop1, drop2, drop3, n - drop1 - drop2 - drop3 - len(keep))):
+            dropped[r] += c
+    return recs.take(keep)
 
 
 # -----------------------------
 # Main extraction per queue
 # -----------------------------
-def extract_queue(html: str, queue: str, name: str) -> List[Rec]:
+def extract_queue(html: Buffer, queue: str, name: str, index: Optional[PageIndex] = None,
+                  backend: str = "auto", tz: str = "Asia/Seoul", decoder: str = "typed") -> RecBatch:
     """
     queue:
       - solo: rankingHistory-1
       - flex: rankingHistory-2
+    html may be the decoded page or its raw bytes (e.g. memory-mapped); pass index to reuse one.
     """
-    block_id = "rankingHistory-1" if queue == "solo" else "rankingHistory-2"
-    block = _slice_block(html, block_id)
-    if not block:
-        return []
+    if index is None:
+        index = index_page(html)
+    block_id = _block_id(queue)
+    if block_id not in index.blocks:
+        return RecBatch(name)
+
+    lp_lit = _find_var_literal(html, index, block_id, LP_VAR_NAMES)
+    rank_lit = _find_var_literal(html, index, block_id, RANK_VAR_NAMES)
+    return _records_from_literals(lp_lit, rank_lit, name, backend, tz, decoder)
+
+
+def _block_id(queue: str) -> str:
+    return "rankingHistory-1" if queue == "solo" else "rankingHistory-2"
 
-    lp_lit = _find_var_literal(block, ["lpData", "lpdata"])
-    rank_lit = _find_var_literal(block, ["rankData", "rankdata"])
+
+def _parse_literals(lp_lit: Optional[str], rank_lit: Optional[str]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
     if not lp_lit or not rank_lit:
-        return []
+        return None
 
     try:
-        lp_obj = _try_parse_json(lp_lit)
-        rank_obj = _try_parse_json(rank_lit)
+        lp_obj = _parse_js_literal(lp_lit)
+        rank_obj = _parse_js_literal(rank_lit)
     except Exception:
-        return []
+        return None
 
     if not isinstance(lp_obj, dict) or not isinstance(rank_obj, dict):
-        return []
+        return None
+    return lp_obj, rank_obj
 
-    recs = _build_records(lp_obj, rank_obj, name)
-    return preprocess(recs)
 
+def _raw_from_literals(lp_lit: Optional[str], rank_lit: Optional[str], name: str,
+                       tz: str = "Asia/Seoul", decoder: str = "typed",
+                       prof: StageProfile = NO_PROFILE) -> RecBatch:
+    """
+    Records (before preprocess) from the two literals; empty if missing or unparsable.
+    decoder "typed" decodes the usual shapes straight into columns and falls back to "json"
+    (json.loads + _build_records, the reference) for anything else.
+    """
+    if not lp_lit or not rank_lit:
+        return RecBatch(name)
+    if decoder == "typed":
+        with prof.stage("decode", len(lp_lit) + len(rank_lit)) as st:
+            recs = _decode_typed(lp_lit, rank_lit, name, tz)
+            if recs is not None:
+                st.records += len(recs)
+                return recs
+
+    with prof.stage("parse", len(lp_lit) + len(rank_lit)):
+        parsed = _parse_literals(lp_lit, rank_lit)
+    if parsed is None:
+        return RecBatch(name)
+    with prof.stage("build") as st:
+        recs = _build_records(parsed[0], parsed[1], name, tz)
+        st.records += len(recs)
+    return recs
+
+
+def _records_from_literals(lp_lit: Optional[str], rank_lit: Optional[str], name: str,
+                           backend: str = "auto", tz: str = "Asia/Seoul", decoder: str = "typed") -> RecBatch:
+    return preprocess(_raw_from_literals(lp_lit, rank_lit, name, tz, decoder), backend)
+
+
+# -----------------------------
+# Snapshot accumulation (--accumulate): one raw timeline per account and queue
+# -----------------------------
+TIMELINE_DIR = ".timelines"
 
-def write_csv(recs: List[Rec], out_file: Path) -> None:
+
+def merge_timelines(old: RecBatch, new: RecBatch) -> RecBatch:
+    """
+    Merge two ts-sorted raw batches of one account in O(len(old) + len(new)).
+    Overlapping snapshots share timestamps; on equal ts the row from new (the later snapshot) wins.
+    The result uses old's name and tiers table.
+    """
+    if not new:
+        return old
+    # old rows followed by new rows (tier codes moved into old's table)
+    remap = [old.tier_code(t) for t in new.tiers]
+    cat = old.take(range(len(old)))
+    cat.ts.extend(new.ts)
+    cat.day.extend(new.day)
+    cat.tier.extend([remap[c] for c in new.tier])
+    cat.lp.extend(new.lp)
+    cat.score.extend(new.score)
+    if not old or new.ts[0] > old.ts[-1]:
+        return cat  # disjoint (the usual daily refresh)
+
+    ts = cat.ts
+    na, n = len(old), len(cat)
+    order: List[int] = []
+    i, j = 0, na
+    while i < na or j < n:
+        if j >= n or (i < na and ts[i] < ts[j]):
+            order.append(i)
+            i += 1
+            continue
+        if i < na and ts[i] == ts[j]:
+            i += 1  # same sample in both snapshots: keep the newer one
+        order.append(j)
+        j += 1
+    return cat.take(order)
+
+
+def _timeline_path(store: Path, name: str, queue: str) -> Path:
+    return store / f"{name}.{queue}.json"
+
+
+def load_timeline(store: Path, name: str, queue: str, tz: str = "Asia/Seoul") -> RecBatch:
+    """Persisted raw timeline of one account/queue (empty batch if none). Days are recomputed for tz."""
+    recs = RecBatch(name)
+    try:
+        data = json.loads(_timeline_path(store, name, queue).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return recs
+    codes = [recs.tier_code(t) for t in data["tiers"]]
+    recs.ts.extend(data["ts"])
+    recs.tier.extend([codes[c] for c in data["tier"]])
+    recs.lp.extend(data["lp"])
+    recs.score.extend(data["score"])
+    recs.day = day_bucketer(tz).days(recs.ts)
+    return recs
+
+
+def save_timeline(store: Path, queue: str, recs: RecBatch) -> None:
+    store.mkdir(parents=True, exist_ok=True)
+    path = _timeline_path(store, recs.name, queue)
+    data = {
+        "version": 1,
+        "name": recs.name,
+        "queue": queue,
+        "tiers": recs.tiers,
+        "ts": recs.ts.tolist(),
+        "tier": recs.tier.tolist(),
+        "lp": recs.lp.tolist(),
+        "score": [round(s, 2) for s in recs.score],
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class SnapshotAccumulator:
+    """
+    Collects the raw batches of every processed page (FileResult.raw) per (account, queue),
+    merges them into the persisted timelines in input order, and writes one preprocessed CSV
+    per account. Pages skipped by --incremental are already part of their timeline.
+    """
+
+    def __init__(self, out_dir: Path, tz: str, prof: StageProfile = NO_PROFILE,
+                 rules: Optional[RuleStats] = None):
+        self.out_dir = out_dir
+        self.store = out_dir / TIMELINE_DIR
+        self.tz = tz
+        self.prof = prof
+        self.rules = rules
+        self.timelines: Dict[Tuple[str, str], RecBatch] = {}
+        self.pages: Dict[Tuple[str, str], int] = {}
+
+    def add(self, res: FileResult) -> None:
+        for q, raw in res.raw:
+            key = (raw.name, q)
+            with self.prof.stage("accumulate") as st:
+                cur = self.timelines.get(key)
+                if cur is None:
+                    cur = load_timeline(self.store, raw.name, q, self.tz)
+                self.timelines[key] = merge_timelines(cur, raw)
+                st.records += len(raw)
+            self.pages[key] = self.pages.get(key, 0) + 1
+
+    def flush(self, backend: str = "auto") -> FileResult:
+        """Write every touched account; the result's path is the out-dir."""
+        res = FileResult(path=self.out_dir, lines=[], worker=os.getpid())
+        prof = self.prof
+        for (name, q), recs in self.timelines.items():
+            t0 = time.perf_counter()
+            with prof.stage("accumulate"):
+                save_timeline(self.store, q, recs)
+            with prof.stage("preprocess") as st:
+                out = preprocess(recs, backend, self.rules.new(q) if self.rules else None)
+                st.records += len(out)
+            out_file = self.out_dir / f"{name}.{q}.csv"
+            _timed_write_csv(out, out_file, prof)
+            res.outputs.append((q, out_file.name, len(out)))
+            res.note(f"[OK] {name} {q}: 페이지 {self.pages[(name, q)]}개 병합, "
+                     f"누적 {len(recs)} raw -> {out_file.name} ({len(out)} rows)", "ok", "merged",
+                     queue=q, account=name, rows=len(out), raw=len(recs), pages=self.pages[(name, q)],
+                     seconds=time.perf_counter() - t0, output=out_file.name)
+        return res
+
+
+def parse_aliases(specs: List[str]) -> Dict[str, str]:
+    """['OLD=NEW', ...] -> {OLD: NEW}; chains (A=B, B=C) resolve to the final name."""
+    aliases: Dict[str, str] = {}
+    for spec in specs:
+        old, sep, new = spec.partition("=")
+        if not sep or not old.strip() or not new.strip():
+            raise ValueError(spec)
+        aliases[old.strip()] = new.strip()
+    for old in aliases:
+        seen = {old}
+        new = aliases[old]
+        while new in aliases and new not in seen:
+            seen.add(new)
+            new = aliases[new]
+        aliases[old] = new
+    return aliases
+
+
+# -----------------------------
+# Sidecar archive (--archive): a page reduced to its title and rankingHistory literals
+# -----------------------------
+SIDECAR_SUFFIX = ".lpd.gz"
+
+
+@dataclass
+class Sidecar:
+    source: str                                   # original page file name
+    size: int                                     # page size / mtime / sha256 when archived
+    mtime_ns: int
+    sha256: str
+    title: Optional[str]                          # raw <title> text (None: name from file name)
+    blocks: Dict[str, Dict[str, Optional[str]]]   # block id -> {"lp": literal, "rank": literal}
+
+
+def _is_sidecar(path: Path) -> bool:
+    return path.name.endswith(SIDECAR_SUFFIX)
+
+
+def sidecar_path(html_path: Path) -> Path:
+    return html_path.with_name(html_path.stem + SIDECAR_SUFFIX)
+
+
+def _page_path(path: Path) -> Path:
+    """The page a sidecar / compressed page stands for (the path itself for pages and bundles)."""
+    if _is_sidecar(path):
+        return path.with_name(path.name[:-len(SIDECAR_SUFFIX)] + ".html")
+    if _input_kind(path) in ("gz", "zst"):
+        return path.with_suffix("")
+    return path
+
+
+def make_sidecar(page: Buffer, html_path: Path, index: Optional[PageIndex] = None) -> Sidecar:
+    if index is None:
+        index = index_page(page)
+    st = html_path.stat()
+    blocks = {
+        b: {"lp": _find_var_literal(page, index, b, LP_VAR_NAMES),
+            "rank": _find_var_literal(page, index, b, RANK_VAR_NAMES)}
+        for b in index.blocks
+    }
+    return Sidecar(
+        source=html_path.name,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        sha256=hashlib.sha256(page if not isinstance(page, str) else page.encode("utf-8")).hexdigest(),
+        title=_text(page, *index.title) if index.title is not None else None,
+        blocks=blocks,
+    )
+
+
+def save_sidecar(sc: Sidecar, path: Path) -> int:
+    """Write sc as gzip'd JSON (atomically). Returns the compressed size."""
+    data = gzip.compress(json.dumps(asdict(sc), ensure_ascii=False).encode("utf-8"), 9, mtime=0)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def load_sidecar(path: Path) -> Sidecar:
+    return Sidecar(**json.loads(gzip.decompress(path.read_bytes())))
+
+
+def fresh_sidecar(html_path: Path) -> Optional[Sidecar]:
+    """The page's sidecar if it exists and was made from the page as it is now (size + mtime)."""
+    path = sidecar_path(html_path)
+    if not path.is_file():
+        return None
+    try:
+        sc = load_sidecar(path)
+    except (OSError, ValueError, TypeError, EOFError):
+        return None
+    st = html_path.stat()
+    if sc.size != st.st_size or sc.mtime_ns != st.st_mtime_ns:
+        return None
+    return sc
+
+
+def archive_file(html_path: Path, prof: StageProfile = NO_PROFILE) -> FileResult:
+    """--archive: write (or refresh) the page's sidecar next to it; no CSVs."""
+    res = FileResult(path=html_path, lines=[])
+    if _is_sidecar(html_path):
+        res.note(f"[SKIP] {html_path.name}: 이미 사이드카", "skip", "already_sidecar")
+        return res
+    t0 = time.perf_counter()
+    out = sidecar_path(html_path)
+    with prof.stage("sidecar"):
+        fresh = fresh_sidecar(html_path)
+    if fresh is not None:
+        res.note(f"[SKIP] {html_path.name}: 사이드카 최신 ({out.name})", "skip", "sidecar_fresh")
+        return res
+    with prof.stage("read") as st:
+        page = html_path.read_bytes()
+        st.bytes += len(page)
+    with prof.stage("archive", len(page)):
+        size = save_sidecar(make_sidecar(page, html_path), out)
+    res.note(f"[ARCHIVE] {html_path.name} -> {out.name} ({len(page) / 1024:.0f} KB -> {size / 1024:.1f} KB)",
+             "ok", "archived", bytes=len(page), seconds=time.perf_counter() - t0, output=out.name)
+    return res
+
+
+# -----------------------------
+# Compressed / bundled inputs: .html.gz, .html.zst, .zip, .tar(.gz|.bz2|.xz), .tgz
+# -----------------------------
+STREAM_CHUNK = 64 * 1024
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+_PAGE_SUFFIXES = (".html", ".htm")
+
+
+def _input_kind(path: Path) -> str:
+    """'sidecar' | 'gz' | 'zst' | 'zip' | 'tar' | 'html' (anything else is read as a plain page)."""
+    name = path.name.lower()
+    if name.endswith(SIDECAR_SUFFIX):
+        return "sidecar"
+    if name.endswith(_TAR_SUFFIXES):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith(".gz"):
+        return "gz"
+    if name.endswith(".zst"):
+        return "zst"
+    return "html"
+
+
+def _block_complete(buf: Buffer, index: PageIndex, block_id: str) -> bool:
+    """
+    True once _find_var_literal(block_id) on this prefix gives what it would give on the whole page:
+    either the block is already closed by the next marker, or the preferred lpData and rankData
+    assignments are present and their balanced scans end inside the prefix.
+    """
+    _, end = index.blocks[block_id]
+    if end < len(buf):
+        return True
+    opener = _OPENER_RE if isinstance(buf, str) else _OPENER_RE_B
+    for names in (LP_VAR_NAMES, RANK_VAR_NAMES):
+        after = index.first_assign(buf, block_id, names[0])
+        if after is None:
+            return False
+        m = opener.search(buf, after, end)
+        if m is None:
+            return False
+        try:
+            _scan_js_literal(buf, m.start(), end)
+        except ValueError:
+            return False
+    return True
+
+
+def _prefix_complete(buf: Buffer, block_ids: Iterable[str], need_title: bool) -> bool:
+    """Is this page prefix enough to extract block_ids (and the title) exactly as from the full page?"""
+    index = index_page(buf)
+    if need_title and (index.title is None or index.title[1] >= len(buf)):
+        return False
+    return all(b in index.blocks and _block_complete(buf, index, b) for b in block_ids)
+
+
+def queue_block_ids(queue_opt: str) -> List[str]:
+    """Blocks a --queue setting can need (auto needs both: a missing block is only known at EOF)."""
+    if queue_opt in ("solo", "flex"):
+        return [_block_id(queue_opt)]
+    return ["rankingHistory-1", "rankingHistory-2"]
+
+
+class _LiteralScan:
+    """Where the first `name = {...}` of one block stands in a growing buffer."""
+
+    __slots__ = ("needle", "assign_from", "after", "i", "stack", "end")
+
+    def __init__(self, name: str, block_start: int):
+        self.needle = name.encode("ascii")
+        self.assign_from = block_start  # next offset to look for the assignment
+        self.after: Optional[int] = None  # offset after '=' (then: where the opener search resumes)
+        self.i = -1                       # literal scan position (-1: opener not seen yet)
+        self.stack: List[bytes] = []
+        self.end: Optional[int] = None    # offset just past the literal once it is complete
+
+    def feed(self, buf: bytearray) -> bool:
+        if self.end is not None:
+            return True
+        n = len(buf)
+        if self.after is None:
+            for m in _ASSIGN_RE_B.finditer(buf, self.assign_from, n):
+                tail = m.start() + 3
+                if buf[tail - len(self.needle):tail] == self.needle:
+                    self.after = m.end()
+                    break
+            else:
+                # an assignment cut at the chunk boundary is found again from here
+                self.assign_from = max(self.assign_from, n - 64)
+                return False
+        if self.i < 0:
+            m = _OPENER_RE_B.search(buf, self.after, n)
+            if m is None:
+                self.after = n
+                return False
+            self.i = m.end()
+            self.stack = [_CLOSERS[bytes(buf[m.start():m.end()])]]
+        self.end, self.i = _scan_tokens(buf, self.i, self.stack, n)
+        return self.end is not None
+
+
+class StreamLocator:
+    """
+    Incremental locator for a page that arrives in chunks: each step (title, block markers,
+    preferred lpData/rankData assignments, balanced literal scans) resumes where the previous chunk
+    left it, so every byte is looked at about once. When all needed literals have closed, the
+    prefix is confirmed with _prefix_complete() (same rules as the full-page extraction); if that
+    ever disagrees, the exact check simply runs on every following chunk.
+    """
+
+    def __init__(self, block_ids: Iterable[str], need_title: bool):
+        self.block_ids = list(block_ids)
+        self.need_title = need_title
+        self.title_pending = need_title
+        self.title_from = 0
+        self.markers = {b: f'{_BLOCK_MARKER}{b.rsplit("-", 1)[1]}"'.encode("ascii") for b in self.block_ids}
+        self.marker_from = 0
+        self.scans: Dict[str, List[_LiteralScan]] = {}
+        self.exact = False
+
+    def feed(self, buf: bytearray) -> bool:
+        """True once buf (the whole prefix read so far) is enough for extraction."""
+        n = len(buf)
+        if self.exact:
+            return _prefix_complete(buf, self.block_ids, self.need_title)
+
+        if self.title_pending:
+            m = _TITLE_RE_B.search(buf, self.title_from)
+            if m is None or m.end() >= n:
+                self.title_from = max(self.title_from, n - 4096)
+                return False
+            self.title_pending = False
+
+        if self.markers:
+            lookback = max(len(m) for m in self.markers.values()) - 1
+            for b, marker in list(self.markers.items()):
+                pos = buf.find(marker, max(0, self.marker_from - lookback))
+                if pos != -1:
+                    del self.markers[b]
+                    self.scans[b] = [_LiteralScan(LP_VAR_NAMES[0], pos), _LiteralScan(RANK_VAR_NAMES[0], pos)]
+            self.marker_from = n
+            if self.markers:
+                return False
+
+        if not all(scan.feed(buf) for scans in self.scans.values() for scan in scans):
+            return False
+        self.exact = True
+        return _prefix_complete(buf, self.block_ids, self.need_title)
+
+
+def read_page_prefix(f: BinaryIO, need_title: bool = True,
+                     block_ids: Iterable[str] = ("rankingHistory-1", "rankingHistory-2"),
+                     chunk_size: int = STREAM_CHUNK) -> bytearray:
+    """
+    Read a page from a (decompressing) stream chunk by chunk and stop as soon as the title and the
+    lpData/rankData literals of block_ids are complete; the rest of the stream is never read.
+    Bytes read are bounded by the end of the last needed literal plus one chunk.
+    Pages lacking one of the blocks are read to the end.
+
+    Returns the read buffer itself (no copy). The literals are bracket-scanned here to know where
+    to stop and scanned again by the extraction, so on a plain page from local disk this costs
+    more CPU than read_bytes() of the whole file; it pays off where reading is the expensive part
+    (decompression, slow storage, large tails after the blocks).
+    """
+    loc = StreamLocator(block_ids, need_title)
+    buf = bytearray()
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return buf
+        buf += chunk
+        try:
+            if loc.feed(buf):
+                return buf
+        except ValueError:
+            loc.exact = True  # odd literal (mismatched brackets): let the exact check decide
+
+
+@contextmanager
+def _open_compressed(path: Path, kind: str) -> Iterator[BinaryIO]:
+    if kind == "gz":
+        with gzip.open(path, "rb") as f:
+            yield f
+    else:
+        if zstandard is None:
+            raise OSError("zstandard가 설치되어 있지 않음 (pip install zstandard)")
+        with path.open("rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as f:
+            yield f
+
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    """Member name; names stored without the UTF-8 flag (zip tools, Korean Windows) are re-decoded."""
+    name = info.filename
+    if info.flag_bits & 0x800:
+        return name
+    raw = name.encode("cp437")
+    for enc in ("utf-8", "cp949"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return name
+
+
+def _iter_bundle_pages(path: Path, kind: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """(member file name, stream) for every *.html member of a zip / tar bundle, in archive order."""
+    if kind == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                name = _zip_member_name(info)
+                if not info.is_dir() and name.lower().endswith(_PAGE_SUFFIXES):
+                    with zf.open(info) as f:
+                        yield name.rsplit("/", 1)[-1], f
+    else:
+        with tarfile.open(path, "r:*") as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(_PAGE_SUFFIXES):
+                    f = tf.extractfile(member)
+                    if f is not None:
+                        yield member.name.rsplit("/", 1)[-1], f
+
+
+def process_packed(path: Path, kind: str, args: argparse.Namespace,
+                   prof: StageProfile = NO_PROFILE) -> FileResult:
+    """Compressed page or page bundle: each page is streamed, never written to disk."""
+    res = FileResult(path=path, lines=[])
+    need_title = not args.name
+    block_ids = queue_block_ids(args.queue)
+    try:
+        with prof.stage("read") as st:
+            if kind in ("gz", "zst"):
+                with _open_compressed(path, kind) as f:
+                    pages = [(_page_path(path), read_page_prefix(f, need_title, block_ids))]
+            else:
+                pages = [(path.parent / member, read_page_prefix(f, need_title, block_ids))
+                         for member, f in _iter_bundle_pages(path, kind)]
+            st.bytes += sum(len(page) for _, page in pages)  # decompressed
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        res.note(f"[SKIP] {path.name}: 압축 해제 실패 ({e})", "skip", "decompress_failed")
+        return res
+    if not pages:
+        res.note(f"[SKIP] {path.name}: 안에 HTML이 없음", "skip", "no_pages")
+
+    for page_path, page in pages:
+        sub = process_page(page, page_path, args, prof)
+        res.lines.extend(sub.lines)
+        res.events.extend(sub.events)
+        res.outputs.extend(sub.outputs)
+        res.raw.extend(sub.raw)
+    return res
+
+
+# -----------------------------
+# Memory-mapped pages (--mmap): index_page/extract_queue work on the raw bytes
+# -----------------------------
+@contextmanager
+def _mapped(path: Path) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Map a file read-only. Empty files cannot be mapped and yield b''."""
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def write_csv(recs: RecBatch, out_file: Path) -> None:
     out_file.parent.mkdir(parents=True, exist_ok=True)
+    name, tiers = recs.name, recs.tiers
+    iso = {d: _day_to_iso(d) for d in set(recs.day)}  # format each day once
     with out_file.open("w", newline="", encoding="utf-8-sig") as f:
         w = csv.writer(f)
         w.writerow(["date", "name", "tier", "lp", "score"])
-        for r in recs:
-            score_str = f"{r.score:.2f}".rstrip("0").rstrip(".")
-            w.writerow([r.date, r.name, r.tier, r.lp, score_str])
+        for day, tier, lp, score in zip(recs.day, recs.tier, recs.lp, recs.score):
+            score_str = f"{score:.2f}".rstrip("0").rstrip(".")
+            w.writerow([iso[day], name, tiers[tier], lp, score_str])
+
+
+def _timed_write_csv(recs: RecBatch, out_file: Path, prof: StageProfile) -> None:
+    with prof.stage("write") as st:
+        write_csv(recs, out_file)
+        st.records += len(recs)
+    if prof.enabled:
+        st.bytes += out_file.stat().st_size
 
 
 def iter_input_files(html_args: List[Path], in_dir: Optional[Path]) -> List[Path]:
     files: List[Path] = []
     if in_dir is not None:
-        files.extend(sorted(in_dir.glob("*.html")))
+        pages = list(in_dir.glob("*.html"))
+        for p in in_dir.iterdir():
+            kind = _input_kind(p)
+            if kind == "sidecar":
+                # sidecars whose page was deleted stand in for it
+                if not _page_path(p).exists():
+                    pages.append(p)
+            elif kind in ("zip", "tar") or (kind in ("gz", "zst") and _page_path(p).suffix.lower() in _PAGE_SUFFIXES):
+                pages.append(p)
+        files.extend(sorted(pages, key=_page_path))
     files.extend(html_args)
 
     seen = set()
@@ -353,53 +1871,565 @@ def iter_input_files(html_args: List[Path], in_dir: Optional[Path]) -> List[Path
     return out
 
 
-def main() -> None:
+def _select_queues(queue_opt: str, has_solo: bool, has_flex: bool) -> List[str]:
+    if queue_opt == "solo":
+        return ["solo"]
+    if queue_opt == "flex":
+        return ["flex"]
+    if queue_opt == "both":
+        return ["solo", "flex"]
+    # auto
+    queues = []
+    if has_solo:
+        queues.append("solo")
+    if has_flex:
+        queues.append("flex")
+    return queues
+
+
+@dataclass
+class FileResult:
+    path: Path
+    lines: List[str]                                   # [OK]/[SKIP] log lines
+    outputs: List[Tuple[str, str, int]] = field(default_factory=list)  # (queue, csv file name, rows)
+    raw: List[Tuple[str, RecBatch]] = field(default_factory=list)      # --accumulate: (queue, raw batch)
+    profile: Optional[StageProfile] = None                             # --profile
+    rules: Optional[RuleStats] = None                                  # --rule-stats
+    events: List[Dict[str, Any]] = field(default_factory=list)         # --log-jsonl, one per lines entry
+    worker: int = 0                                                    # pid of the process that made it
+
+    def note(self, line: str, outcome: str, reason: str, **fields: Any) -> None:
+        """Add a log line and its structured event (queue, page, bytes, rows, seconds, output)."""
+        self.lines.append(line)
+        event = {"time": round(time.time(), 3), "queue": None, "outcome": outcome, "reason": reason,
+                 "bytes": 0, "rows": 0, "seconds": 0.0}
+        event.update(fields)
+        self.events.append(event)
+
+
+Literals = Callable[[str], Tuple[Optional[str], Optional[str]]]  # block id -> (lpData, rankData)
+
+
+def page_literals(page: Union[Buffer, Sidecar], page_name: str = "", name: Optional[str] = None,
+                  prof: StageProfile = NO_PROFILE) -> Tuple[str, Collection[str], Literals]:
+    """
+    (player name, rankingHistory block ids, literals) of one page (str, bytes or mmap) or of its sidecar;
+    literals(block_id) gives the block's (lpData, rankData) literals. name, when given, replaces the
+    title; a page without a title is named after page_name (a sidecar after its source page).
+    """
+    if isinstance(page, Sidecar):
+        sc = page
+        if not name:
+            name = _clean_title(sc.title) if sc.title is not None else _name_from_filename(sc.source)
+
+        def from_sidecar(block_id: str) -> Tuple[Optional[str], Optional[str]]:
+            lits = sc.blocks.get(block_id, {})
+            return lits.get("lp"), lits.get("rank")
+
+        return name, sc.blocks, from_sidecar
+
+    with prof.stage("index", len(page)):
+        index = index_page(page)
+    with prof.stage("title"):
+        name = name or _extract_name(page, page_name, index)
+
+    def from_page(block_id: str) -> Tuple[Optional[str], Optional[str]]:
+        return (_find_var_literal(page, index, block_id, LP_VAR_NAMES),
+                _find_var_literal(page, index, block_id, RANK_VAR_NAMES))
+
+    return name, index.blocks, from_page
+
+
+def _process_blocks(res: FileResult, page_path: Path, name: str, blocks: Iterable[str], literals: Literals,
+                    args: argparse.Namespace, prof: StageProfile = NO_PROFILE) -> FileResult:
+    """
+    Shared tail of process_page/process_sidecar, on what page_literals() found; outputs are named
+    after page_path.
+    """
+    queues = _select_queues(args.queue, "rankingHistory-1" in blocks, "rankingHistory-2" in blocks)
+    if not queues:
+        res.note(f"[SKIP] {page_path.name}: rankingHistory 블록이 없음", "skip", "no_blocks", page=page_path.name)
+        return res
+
+    def located(q: str) -> Tuple[Optional[str], Optional[str]]:
+        with prof.stage("locate") as st:
+            lits = literals(_block_id(q))
+            st.bytes += sum(len(lit) for lit in lits if lit)
+        return lits
+
+    if args.accumulate:
+        # raw rows only; SnapshotAccumulator merges them per account and writes the CSVs
+        name = args.aliases.get(name, name)
+        for q in queues:
+            t0 = time.perf_counter()
+            lits = located(q)
+            raw = _raw_from_literals(*lits, name, args.tz, args.decoder, prof)
+            ev = dict(queue=q, page=page_path.name, bytes=sum(len(lit) for lit in lits if lit))
+            if not raw:
+                res.note(f"[SKIP] {page_path.name}: {q} lpData/rankData 파싱 실패 또는 데이터 없음",
+                         "skip", "no_data", seconds=time.perf_counter() - t0, **ev)
+                continue
+            res.raw.append((q, raw))
+            res.outputs.append((q, f"{name}.{q}.csv", len(raw)))
+            res.note(f"[OK] {page_path.name} -> {name} {q} ({len(raw)} raw)", "ok", "raw",
+                     rows=len(raw), seconds=time.perf_counter() - t0, account=name, **ev)
+        return res
+
+    if args.rule_stats is not None and res.rules is None:
+        res.rules = RuleStats(args.rule_timing)
+    for q in queues:
+        t0 = time.perf_counter()
+        lits = located(q)
+        raw = _raw_from_literals(*lits, name, args.tz, args.decoder, prof)
+        with prof.stage("preprocess") as st:
+            recs = preprocess(raw, args.backend, res.rules.new(q) if res.rules else None)
+            st.records += len(recs)
+        ev = dict(queue=q, page=page_path.name, bytes=sum(len(lit) for lit in lits if lit))
+        if not recs:
+            res.note(f"[SKIP] {page_path.name}: {q} lpData/rankData 파싱 실패 또는 데이터 없음",
+                     "skip", "no_data", seconds=time.perf_counter() - t0, **ev)
+            continue
+
+        out_file = args.out_dir / f"{page_path.stem}.{q}.csv"
+        _timed_write_csv(recs, out_file, prof)
+        res.outputs.append((q, out_file.name, len(recs)))
+        res.note(f"[OK] {page_path.name} -> {out_file.name} ({len(recs)} rows)", "ok", "csv",
+                 rows=len(recs), seconds=time.perf_counter() - t0, output=out_file.name, **ev)
+    return res
+
+
+def process_page(page: Buffer, html_path: Path, args: argparse.Namespace,
+                 prof: StageProfile = NO_PROFILE) -> FileResult:
+    """Extract every selected queue of one page (decoded str or raw bytes/mmap) and write CSVs."""
+    name, blocks, literals = page_literals(page, html_path.name, args.name, prof)
+    return _process_blocks(FileResult(path=html_path, lines=[]), html_path, name, blocks, literals, args, prof)
+
+
+def process_sidecar(sc: Sidecar, path: Path, args: argparse.Namespace,
+                    prof: StageProfile = NO_PROFILE) -> FileResult:
+    """Same as process_page, from an archived sidecar (outputs/logs named after the original page)."""
+    name, blocks, literals = page_literals(sc, name=args.name)
+    return _process_blocks(FileResult(path=path, lines=[]), path.with_name(sc.source), name, blocks, literals,
+                           args, prof)
+
+
+def process_file(html_path: Path, args: argparse.Namespace) -> FileResult:
+    prof = StageProfile() if args.profile else NO_PROFILE
+    res = _process_input(html_path, args, prof)
+    if args.profile:
+        res.profile = prof
+    res.worker = os.getpid()
+    return res
+
+
+def _process_input(html_path: Path, args: argparse.Namespace, prof: StageProfile) -> FileResult:
+    kind = _input_kind(html_path)
+    if args.archive:
+        if kind not in ("html", "sidecar"):
+            res = FileResult(path=html_path, lines=[])
+            res.note(f"[SKIP] {html_path.name}: 압축/묶음 입력은 --archive 대상 아님", "skip", "archive_unsupported")
+            return res
+        return archive_file(html_path, prof)
+    if kind == "sidecar":
+        with prof.stage("sidecar"):
+            sc = load_sidecar(html_path)
+        return process_sidecar(sc, html_path, args, prof)
+    if kind != "html":
+        return process_packed(html_path, kind, args, prof)
+    with prof.stage("sidecar"):
+        sc = fresh_sidecar(html_path)
+    if sc is not None:
+        return process_sidecar(sc, html_path, args, prof)
+
+    if args.stream:
+        # read only up to the last literal the selected queues need
+        with prof.stage("read") as st, html_path.open("rb") as f:
+            page = read_page_prefix(f, not args.name, queue_block_ids(args.queue))
+            st.bytes += len(page)
+        return process_page(page, html_path, args, prof)
+    if args.mmap:
+        # no "read" stage: the mapping is faulted in lazily, during "index" and "locate"
+        with _mapped(html_path) as buf:
+            return process_page(buf, html_path, args, prof)
+    # raw bytes: the page is indexed undecoded and only the literals are decoded
+    with prof.stage("read") as st:
+        page = html_path.read_bytes()
+        st.bytes += len(page)
+    return process_page(page, html_path, args, prof)
+
+
+def _run_parallel(files: List[Path], args: argparse.Namespace) -> Iterator[FileResult]:
+    """
+    Process files in a process pool, largest first (so the long tail starts early),
+    and yield each file's result in input order.
+    """
+    by_size = sorted(files, key=lambda p: p.stat().st_size, reverse=True)
+    with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+        futures = {p: ex.submit(process_file, p, args) for p in by_size}
+        for p in files:
+            yield futures[p].result()
+
+
+# -----------------------------
+# Incremental runs: manifest of processed inputs in the out-dir
+# -----------------------------
+MANIFEST_NAME = ".extract_manifest.json"
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExtractManifest:
+    """
+    {path: {size, mtime_ns, sha256, outputs}} for one out-dir, valid for one (queue, name) setting.
+    An input is unchanged when size+mtime match, or when only mtime moved but the sha256 still matches
+    (re-saved or touched page). Its outputs are reused if they all still exist.
+    """
+
+    def __init__(self, out_dir: Path, options: Dict[str, Any]):
+        self.path = out_dir / MANIFEST_NAME
+        self.out_dir = out_dir
+        self.options = options
+        self.files: Dict[str, Dict[str, Any]] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("options") == options:
+            self.files = data.get("files", {})
+
+    def lookup(self, path: Path) -> Tuple[Optional[FileResult], Dict[str, Any]]:
+        """
+        (cached result for an unchanged input or None, the input's fingerprint for record()).
+        The fingerprint carries the sha256 whenever this check already knows it, so record() only
+        hashes inputs that were new or changed size.
+        """
+        st = path.stat()
+        entry = self.files.get(str(path))
+        fp: Dict[str, Any] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+        if entry is not None and entry["size"] == st.st_size:
+            if entry["mtime_ns"] == st.st_mtime_ns:
+                fp["sha256"] = entry["sha256"]
+            else:
+                fp["sha256"] = _file_sha256(path)
+                if fp["sha256"] != entry["sha256"]:
+                    entry = None
+                else:
+                    entry["mtime_ns"] = st.st_mtime_ns
+            if entry is not None and all((self.out_dir / o[1]).is_file() for o in entry["outputs"]):
+                outputs = [tuple(o) for o in entry["outputs"]]
+                res = FileResult(path=path, lines=[], outputs=outputs, worker=os.getpid())
+                res.note(f"[CACHE] {path.name}: 변경 없음, 기존 출력 {len(outputs)}개 재사용", "cached", "unchanged",
+                         rows=sum(o[2] for o in outputs))
+                return res, fp
+        return None, fp
+
+    def record(self, res: FileResult, fp: Dict[str, Any]) -> None:
+        """Store the outputs of a processed input under the fingerprint lookup() returned for it."""
+        if "sha256" not in fp:
+            fp["sha256"] = _file_sha256(res.path)
+        fp["outputs"] = [list(o) for o in res.outputs]
+        self.files[str(res.path)] = fp
+
+    def save(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        data = {"version": 1, "options": self.options, "files": self.files}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# -----------------------------
+# Structured run log (--log-jsonl)
+# -----------------------------
+class JsonlLog:
+    """
+    Appends one JSON object per line to PATH from a background thread. The result loop only enqueues
+    (FileResult events are turned into dicts and serialized on the thread), and the thread writes
+    whatever has piled up in one buffered write + flush, so a slow disk never holds up a batch.
+
+    Every line carries "run" (one id per invocation) and "event": "start", "result" (one per file
+    and queue: outcome, reason, bytes, rows, seconds, worker, ...) or "end".
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: Path, buffer_size: int = 1 << 16):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.run = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{os.getpid()}"
+        self._f = path.open("a", encoding="utf-8", buffering=buffer_size)
+        self._q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="jsonl-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        self._q.put({"time": round(time.time(), 3), "run": self.run, "event": event, **fields})
+
+    def result(self, res: FileResult) -> None:
+        if res.events:
+            self._q.put(res)
+
+    def close(self) -> None:
+        self._q.put(self._STOP)
+        self._thread.join()
+        self._f.close()
+
+    def _lines(self, item: Any) -> Iterator[str]:
+        if isinstance(item, FileResult):
+            head = {"run": self.run, "event": "result", "file": str(item.path), "worker": item.worker}
+            for ev in item.events:
+                yield json.dumps({**head, **ev}, ensure_ascii=False, separators=(",", ":"))
+        else:
+            yield json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            while True:  # take everything already queued, write it in one go
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is self._STOP for item in batch)
+            self._f.write("".join(line + "\n" for item in batch if item is not self._STOP
+                                  for line in self._lines(item)))
+            self._f.flush()
+            if stop:
+                return
+
+
+# -----------------------------
+# Long-lived worker (--worker)
+# -----------------------------
+def _read_paths(stream: BinaryIO, sep: bytes) -> Iterator[Path]:
+    """Paths from stdin as they arrive (not only at EOF); sep is b"\\n" or b"\\0"."""
+    buf = b""
+    while True:
+        chunk = stream.read1(1 << 16) if hasattr(stream, "read1") else stream.read(1 << 16)
+        if not chunk:
+            break
+        buf += chunk
+        *items, buf = buf.split(sep)
+        for item in items:
+            item = item.rstrip(b"\r") if sep == b"\n" else item
+            if item.strip():
+                yield Path(os.fsdecode(item))
+    if buf.strip():
+        yield Path(os.fsdecode(buf.rstrip(b"\r\n")))
+
+
+def worker_reply(res: FileResult, seconds: float) -> Dict[str, Any]:
+    """The one stdout line answering one path: outcome, reason codes, CSVs written, log lines."""
+    outcomes = [ev["outcome"] for ev in res.events]
+    if res.outputs:
+        outcome = "ok"
+    else:
+        outcome = "error" if "error" in outcomes else (outcomes[0] if outcomes else "skip")
+    return {"path": str(res.path), "outcome": outcome, "reasons": [ev["reason"] for ev in res.events],
+            "outputs": [list(o) for o in res.outputs], "rows": sum(o[2] for o in res.outputs),
+            "seconds": seconds, "lines": res.lines}
+
+
+def serve_worker(args: argparse.Namespace, stdin: BinaryIO, stdout: Any,
+                 on_result: Optional[Callable[[FileResult], None]] = None) -> int:
+    """
+    --worker: process paths read from stdin one at a time with the already parsed options, and answer
+    each with one JSON line on stdout (flushed), so a shell hook pays interpreter start, imports and
+    argparse once instead of per page. A missing or failing page is answered with outcome "error"
+    and the worker keeps going. Returns the number of paths handled.
+    """
+    handled = 0
+    for path in _read_paths(stdin, b"\0" if args.null else b"\n"):
+        t0 = time.perf_counter()
+        try:
+            if path.is_file():
+                res = process_file(path.resolve(), args)
+            else:
+                res = FileResult(path=path, lines=[], worker=os.getpid())
+                res.note(f"[ERROR] {path}: 파일 없음", "error", "not_found")
+        except Exception as e:  # one bad page must not take the worker down
+            res = FileResult(path=path, lines=[], worker=os.getpid())
+            res.note(f"[ERROR] {path}: {type(e).__name__}: {e}", "error", "exception", error=repr(e))
+        stdout.write(json.dumps(worker_reply(res, time.perf_counter() - t0), ensure_ascii=False,
+                                separators=(",", ":")) + "\n")
+        stdout.flush()
+        if on_result is not None:
+            on_result(res)
+        handled += 1
+    return handled
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line -> checked options with the derived fields process_file expects (aliases, jobs, ...)."""
     ap = argparse.ArgumentParser()
     ap.add_argument("html", nargs="*", type=Path, help="HTML 파일(여러 개 가능)")
-    ap.add_argument("--in-dir", type=Path, default=None, help="폴더 안의 *.html 전부 처리")
+    ap.add_argument("--in-dir", type=Path, default=None,
+                    help="폴더 안의 *.html 전부 처리 (*.html.gz/.html.zst/.zip/.tar* 포함)")
     ap.add_argument("--queue", choices=["solo", "flex", "both", "auto"], default="auto",
                     help="뽑을 큐 선택 (auto=있는 것만)")
     ap.add_argument("--out-dir", type=Path, default=Path("out"), help="출력 폴더")
     ap.add_argument("--name", default=None, help="name 컬럼 강제 지정 (미지정 시 title/파일명에서 추출)")
-    args = ap.parse_args()
-
-    files = iter_input_files(args.html, args.in_dir)
-    if not files:
-        raise SystemExit("처리할 HTML 파일이 없음. (*.html)")
-
-    for html_path in files:
-        html = html_path.read_text(encoding="utf-8", errors="ignore")
-        name = args.name or _extract_name(html, html_path.name)
-
-        has_solo = 'id="rankingHistory-1"' in html
-        has_flex = 'id="rankingHistory-2"' in html
-
-        if args.queue == "solo":
-            queues = ["solo"]
-        elif args.queue == "flex":
-            queues = ["flex"]
-        elif args.queue == "both":
-            queues = ["solo", "flex"]
-        else:  # auto
-            queues = []
-            if has_solo:
-                queues.append("solo")
-            if has_flex:
-                queues.append("flex")
-
-        if not queues:
-            print(f"[SKIP] {html_path.name}: rankingHistory 블록이 없음")
-            continue
+    read_mode = ap.add_mutually_exclusive_group()
+    read_mode.add_argument("--mmap", action="store_true",
+                           help="HTML을 읽지 않고 mmap으로 열어서 처리 (대용량 아카이브용)")
+    read_mode.add_argument("--stream", action="store_true",
+                           help="HTML을 조각 단위로 읽다가 필요한 큐의 lpData/rankData가 다 나오면 읽기 중단 "
+                                "(읽는 양은 줄지만 리터럴을 한 번 더 훑어서 로컬 디스크의 일반 HTML은 오히려 느림; "
+                                "느린 저장소용. 압축 입력은 항상 이렇게 읽음)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="병렬 프로세스 수 (0=CPU 코어 수, 기본 1=순차 처리)")
+    ap.add_argument("--incremental", action="store_true",
+                    help=f"out-dir의 {MANIFEST_NAME} 기준으로 바뀌지 않은 HTML은 건너뛰고 기존 CSV 재사용")
+    ap.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                    help="전처리 방식 (auto=numpy 설치 시 긴 히스토리에만 사용)")
+    ap.add_argument("--decoder", choices=["typed", "json"], default="typed",
+                    help="lpData/rankData 해석 방식 (typed=배열로 바로 해석, 모양이 다르면 json으로 대체)")
+    ap.add_argument("--tz", default="Asia/Seoul",
+                    help="date 컬럼(하루 단위 묶음) 기준 시간대 (기본 Asia/Seoul)")
+    ap.add_argument("--archive", action="store_true",
+                    help=f"CSV 대신 HTML 옆에 {SIDECAR_SUFFIX} 사이드카(title + lpData/rankData 원문)만 생성")
+    ap.add_argument("--accumulate", action="store_true",
+                    help=f"같은 계정의 여러 저장본을 out-dir/{TIMELINE_DIR}의 누적 기록과 합쳐 계정별 CSV 하나로 출력")
+    ap.add_argument("--alias", action="append", default=[], metavar="OLD=NEW",
+                    help="닉네임 변경: OLD 이름의 페이지를 NEW 계정으로 취급 (--accumulate, 여러 번 가능)")
+    ap.add_argument("--profile", action="store_true",
+                    help="파일별/단계별(read, index, locate, decode, preprocess, write ...) 시간·바이트·레코드 수 집계표 출력")
+    ap.add_argument("--profile-json", type=Path, default=None, metavar="PATH",
+                    help="--profile 결과(파일별 단계 기록 포함)를 JSON으로 저장 (--profile 포함)")
+    ap.add_argument("--rule-stats", type=Path, default=None, metavar="PATH",
+                    help="전처리 규칙별로 지운 행 수·시간을 히스토리(계정/큐)마다 JSON으로 저장하고 집계표 출력")
+    ap.add_argument("--rule-timing", action="store_true",
+                    help="--rule-stats에서 python 전처리도 규칙을 하나씩 따로 돌려 규칙별 시간 측정 (결과 같음, 느림)")
+    ap.add_argument("--log-jsonl", type=Path, default=None, metavar="PATH",
+                    help="파일/큐마다 결과(outcome, reason, bytes, rows, seconds, worker)를 JSON 한 줄씩 PATH에 추가 "
+                         "(화면 출력은 그대로)")
+    ap.add_argument("--worker", action="store_true",
+                    help="상주 모드: stdin에서 HTML 경로를 한 줄씩 받아 처리하고 경로마다 stdout에 JSON 결과 한 줄로 응답 "
+                         "(사람용 로그는 stderr, HTML 인자/--in-dir/--jobs/--incremental/--accumulate 미지원)")
+    ap.add_argument("-0", "--null", action="store_true",
+                    help="--worker에서 경로를 줄바꿈 대신 NUL 문자로 구분 (find -print0 등)")
+    args = ap.parse_args(argv)
+    args.profile = args.profile or args.profile_json is not None
 
-        for q in queues:
-            recs = extract_queue(html, q, name)
-            if not recs:
-                print(f"[SKIP] {html_path.name}: {q} lpData/rankData 파싱 실패 또는 데이터 없음")
-                continue
+    try:
+        args.aliases = parse_aliases(args.alias)
+    except ValueError as e:
+        raise SystemExit(f"--alias: OLD=NEW 형식이 아님 ({e})")
 
-            out_file = args.out_dir / f"{html_path.stem}.{q}.csv"
-            write_csv(recs, out_file)
-            print(f"[OK] {html_path.name} -> {out_file.name} ({len(recs)} rows)")
+    try:
+        day_bucketer(args.tz)
+    except Exception:
+        raise SystemExit(f"--tz: 알 수 없는 시간대 {args.tz!r}")
+    if args.backend == "numpy" and np is None:
+        raise SystemExit("--backend numpy: numpy가 설치되어 있지 않음 (pip install numpy)")
+    if args.archive:
+        args.incremental = args.accumulate = False  # sidecars carry their own freshness check
+    if args.worker and (args.accumulate or args.incremental):
+        ap.error("--worker: --accumulate/--incremental과 함께 쓸 수 없음 (경로마다 바로 CSV를 씀)")
+    if args.worker and args.jobs != 1:
+        ap.error("--worker: --jobs와 함께 쓸 수 없음 (경로를 받은 순서대로 하나씩 처리)")
+    if args.worker and (args.html or args.in_dir is not None):
+        ap.error("--worker: 경로는 stdin으로만 받음 (HTML 인자/--in-dir와 함께 쓸 수 없음)")
+    if args.null and not args.worker:
+        ap.error("--null은 --worker와 함께만 사용")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    human = sys.stderr if args.worker else sys.stdout  # --worker: stdout carries the replies
+
+    files: List[Path] = []
+    if not args.worker:
+        files = iter_input_files(args.html, args.in_dir)
+        if not files:
+            raise SystemExit("처리할 HTML 파일이 없음. (*.html)")
+
+    manifest = None
+    cached: Dict[Path, FileResult] = {}
+    fingerprints: Dict[Path, Dict[str, Any]] = {}  # --incremental: ExtractManifest.lookup() -> record()
+    todo = files
+    if args.incremental:
+        # everything that changes the CSVs: a different zone or decoder invalidates the manifest
+        options: Dict[str, Any] = {"queue": args.queue, "name": args.name, "tz": args.tz,
+                                   "decoder": args.decoder}
+        if args.accumulate:
+            options.update(accumulate=True, aliases=args.aliases)
+        manifest = ExtractManifest(args.out_dir, options)
+        for p in files:
+            hit, fingerprints[p] = manifest.lookup(p)
+            if hit is not None:
+                cached[p] = hit
+        todo = [p for p in files if p not in cached]
+
+    if args.jobs > 1 and len(todo) > 1:
+        results = _run_parallel(todo, args)
+    else:
+        results = (process_file(p, args) for p in todo)
+
+    run_prof = StageProfile() if args.profile else NO_PROFILE  # work not tied to one file
+    profiles: List[Tuple[Path, StageProfile]] = []
+    run_rules = RuleStats(args.rule_timing) if args.rule_stats is not None else None
+    rule_files: List[Tuple[Path, RuleStats]] = []
+    acc = SnapshotAccumulator(args.out_dir, args.tz, run_prof, run_rules) if args.accumulate else None
+    log = JsonlLog(args.log_jsonl) if args.log_jsonl is not None else None
+    outcomes: Dict[str, int] = {}
+    if log is not None:
+        log.emit("start", argv=sys.argv[1:], files=len(files), cached=len(cached), jobs=args.jobs,
+                 worker_mode=args.worker)
+
+    def report(res: FileResult) -> None:
+        if res.profile is not None:
+            profiles.append((res.path, res.profile))
+        if res.rules is not None:
+            rule_files.append((res.path, res.rules))
+        for line in res.lines:
+            print(line, file=human)
+        if log is not None:
+            log.result(res)
+            for ev in res.events:
+                outcomes[ev["outcome"]] = outcomes.get(ev["outcome"], 0) + 1
+
+    try:
+        if args.worker:
+            serve_worker(args, sys.stdin.buffer, sys.stdout, report)
+        for p in files:
+            res = cached.get(p) or next(results)
+            if manifest is not None and p not in cached:
+                manifest.record(res, fingerprints[p])
+            if acc is not None:
+                acc.add(res)
+            report(res)
+
+        if acc is not None:
+            report(acc.flush(args.backend))
+        if manifest is not None:
+            manifest.save()
+    finally:
+        if log is not None:
+            log.emit("end", seconds=time.perf_counter() - started, outcomes=outcomes,
+                     complete=sys.exc_info()[0] is None)
+            log.close()
+
+    if args.profile:
+        wall = time.perf_counter() - started
+        for line in format_profile(profiles, run_prof, wall, args.jobs):
+            print(line, file=human)
+        if args.profile_json is not None:
+            save_profile_json(args.profile_json, profiles, run_prof, wall, args.jobs)
+    if args.rule_stats is not None:
+        for line in format_rule_stats(rule_files, run_rules):
+            print(line, file=human)
+        save_rule_stats_json(args.rule_stats, rule_files, run_rules, time.perf_counter() - started)
 
 
 if __name__ == "__main__":
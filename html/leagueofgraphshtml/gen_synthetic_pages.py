@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic LeagueOfGraphs saved pages for scale testing of the extractors, preprocessing and merges.
+
+Each player gets a simulated ladder history (LP random walk with promotions/demotions, active and
+inactive stretches, soft resets at season starts) rendered the way the real pages carry it:
+title, a long head, the rankingHistory-1 (solo) and rankingHistory-2 (flex) blocks with the site's
+graph script (graphIntegerValues24 / graphData / lpData / rankData, PHP-style escaped <img> markup),
+and page noise around and between the blocks.
+
+Knobs
+- --players N, --years Y, --samples-per-day S (mean games per active day; flex gets --flex-rate of it)
+- --resample-rate: mean number of extra samples per day that record the unchanged current state
+  (the site re-samples between games; these are the consecutive duplicates rule 2 removes)
+- --iron0-rate: chance per game sample of an extra "Iron IV, 0LP" glitch minutes after it, on the
+  same day (removed by the same-day rule)
+- --iron0-lone-rate: chance per day without games of a lone "Iron IV, 0LP" sample, followed the next
+  day by a re-sample of the real state (A -> Iron0 -> A sandwiches, removed by the sandwich rule)
+- --repeat-rate: chance per season start that the last state is recorded again 1-3 times
+  (season-boundary repeats)
+- --head-kb / --between-kb / --tail-kb: page noise before, between and after the blocks
+  (defaults are close to the saved pages: blocks at ~200 KB, ~2.5 MB after them)
+- --snapshots K: K saves per player, --snapshot-gap-days apart, newer saves named "... (1).html" like a browser does,
+  for --accumulate / merge runs
+- --compress gz: write .html.gz pages (read directly by extract_lpdata_daily_last_v2.py)
+- --seed: every player is generated from (seed, player number), so the output does not depend on --jobs
+
+Usage examples
+  python gen_synthetic_pages.py --players 200 --years 10 --out-dir synth
+  python gen_synthetic_pages.py --players 5000 --tail-kb 0 --compress gz --jobs 0 --out-dir synth_5k
+  python extract_lpdata_daily_last_v2.py --in-dir synth --queue both --out-dir synth_out --profile
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TIER_GROUPS = ["Iron", "Bronze", "Silver", "Gold", "Platinum", "Emerald", "Diamond"]
+DIVS = ["IV", "III", "II", "I"]
+LADDER_STEPS = len(TIER_GROUPS) * len(DIVS)  # ladder index 0 = Iron IV ... 27 = Diamond I
+
+KST = timezone(timedelta(hours=9))
+DAY_MS = 24 * 60 * 60 * 1000
+IMG_VERSION = 1766164811
+
+SYLLABLES = ("가 나 다 라 마 바 사 아 자 차 카 타 파 하 강 건 고 구 규 민 서 석 성 수 순 승 시 연 영 "
+             "우 원 유 윤 은 이 재 정 주 준 지 진 찬 철 태 하 한 현 호 환 훈 희 밤 별 빛 꽃 늘 봄 탬 뚱 "
+             "렐 픽 짱 댕 냥 곰 솔 랭 정 글 탑 딜 폿").split()
+LATIN = "Aileri Synow Paean Shayd Zeus Faker Lov3 dnc Nova Hide Ruler Canyon Kiin Peyz Oner Gumayusi".split()
+CHAMPIONS = "Ahri Lux Garen Yasuo Jinx Thresh LeeSin Ezreal Kaisa Viego Sett Yone Orianna Nautilus".split()
+
+
+@dataclass
+class GenOptions:
+    years: float
+    samples_per_day: float
+    flex_share: float
+    flex_rate: float
+    resample_rate: float
+    iron0_rate: float
+    iron0_lone_rate: float
+    repeat_rate: float
+    seasons_per_year: int
+    head_kb: int
+    between_kb: int
+    tail_kb: int
+    snapshots: int
+    snapshot_gap_days: int
+    end: date
+    compress: str
+    seed: int
+
+
+# -----------------------------
+# Ladder simulation
+# -----------------------------
+def _tier_of(idx: int) -> Tuple[int, int]:
+    """Ladder index -> (tierId, rankId) as in rankData (rankId 4 = IV)."""
+    return idx // 4 + 1, 4 - idx % 4
+
+
+def _kst_midnight_ms(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=KST).timestamp() * 1000)
+
+
+def season_starts(start: date, end: date, per_year: int) -> List[int]:
+    """Season start timestamps (ms) in [start, end]: Jan 9 03:00 UTC, then evenly spaced splits."""
+    out = []
+    for year in range(start.year, end.year + 1):
+        first = datetime(year, 1, 9, 3, tzinfo=timezone.utc)
+        for k in range(per_year):
+            ts = int((first + timedelta(days=365 * k / per_year)).timestamp() * 1000)
+            if _kst_midnight_ms(start) <= ts <= _kst_midnight_ms(end):
+                out.append(ts)
+    return out
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:  # normal approximation; Knuth's loop gets slow
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def simulate_queue(rng: random.Random, start: date, end: date, rate: float, opts: GenOptions,
+                   seasons: Sequence[int]) -> List[Tuple[int, int, int]]:
+    """[(ts ms, ladder index, lp)] in time order; re-samples, glitches and season repeats included."""
+    idx = rng.randint(2, 22)
+    lp = rng.randint(0, 99)
+    target = min(LADDER_STEPS - 1, max(0, idx + rng.randint(-4, 6)))  # where the player's skill sits
+    stay_active, stay_idle = rng.uniform(0.6, 0.95), rng.uniform(0.5, 0.95)
+    active = rng.random() < 0.5
+
+    out: List[Tuple[int, int, int]] = []
+    next_season = 0
+    last_ts = 0
+    day = start
+    while day <= end:
+        day_ms = _kst_midnight_ms(day)
+        while next_season < len(seasons) and seasons[next_season] < day_ms + DAY_MS:
+            boundary = seasons[next_season]
+            next_season += 1
+            if out and rng.random() < opts.repeat_rate:
+                # the site records the closing state again around the boundary
+                for k in range(rng.randint(1, 3)):
+                    last_ts = max(last_ts + 1, boundary + k * rng.randint(1, 3_600_000))
+                    out.append((last_ts, out[-1][1], out[-1][2]))
+            idx, lp = max(0, idx - rng.randint(2, 5)), 0  # soft reset
+            target = min(LADDER_STEPS - 1, max(0, target + rng.randint(-1, 2)))
+
+        if out and out[-1][1:] == (0, 0) and (idx, lp) != (0, 0):
+            # the day after a lone glitch: the site records the real state again
+            last_ts = max(last_ts + 1, day_ms + rng.randrange(DAY_MS // 4))
+            out.append((last_ts, idx, lp))
+
+        active = rng.random() < (stay_active if active else 1 - stay_idle)
+        games = _poisson(rng, rate) if active else 0
+        if out and not games and (idx, lp) != (0, 0) and rng.random() < opts.iron0_lone_rate:
+            last_ts = max(last_ts + 1, day_ms + rng.randrange(DAY_MS))
+            out.append((last_ts, 0, 0))
+            day += timedelta(days=1)
+            continue
+
+        # game results (True) and unchanged-state re-samples (False), in time order
+        events = sorted([(rng.randrange(DAY_MS), True) for _ in range(games)]
+                        + [(rng.randrange(DAY_MS), False) for _ in range(_poisson(rng, opts.resample_rate))])
+        for t, game in events:
+            if not game:
+                if out:
+                    last_ts = max(last_ts + 1, day_ms + t)
+                    out.append((last_ts, idx, lp))
+                continue
+            win = rng.random() < min(0.8, max(0.2, 0.5 + 0.03 * (target - idx)))
+            lp += rng.randint(15, 28) if win else -rng.randint(12, 25)
+            if lp >= 100:
+                if idx < LADDER_STEPS - 1:
+                    idx, lp = idx + 1, lp - 100
+                else:
+                    lp = 99
+            elif lp < 0:
+                if idx > 0:
+                    idx, lp = idx - 1, 75
+                else:
+                    lp = 0
+            last_ts = max(last_ts + 1, day_ms + t)
+            out.append((last_ts, idx, lp))
+            if rng.random() < opts.iron0_rate and (idx, lp) != (0, 0):
+                last_ts += rng.randint(1, 600_000)
+                out.append((last_ts, 0, 0))
+        day += timedelta(days=1)
+    return out
+
+
+# -----------------------------
+# Page rendering
+# -----------------------------
+def _php_json(obj: object) -> str:
+    """json_encode() as the site emits it: compact, '/' escaped."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).replace("/", "\\/")
+
+
+def _rank_entry(idx: int) -> Dict[str, object]:
+    tier_id, rank_id = _tier_of(idx)
+    label = f"{TIER_GROUPS[tier_id - 1]} {DIVS[4 - rank_id]}"
+    img = (f'<img src="//lolg-cdn.porofessor.gg/img/s/fond_sprite.png?v={IMG_VERSION}" alt="{label}" '
+           f'title="{label}" height="36" width="36" class="leagueicons-36-{tier_id} "/>')
+    return {"tierId": tier_id, "rankId": rank_id, "rankStr": DIVS[4 - rank_id],
+            "tierRankString": label, "image": img}
+
+
+RANK_BODIES = [_php_json(_rank_entry(i)) for i in range(LADDER_STEPS)]
+GRAPH_VALUES = "[" + ",".join(RANK_BODIES) + "]"
+
+SCRIPT_TEMPLATE = """<script language="javascript" type="text/javascript">
+    var graphGrid;
+    var toUseGrid = graphGrid || {color: "#BBB", backgroundColor: "#FFF", borderWidth: 1, borderColor: "#E2E2E2"};
+    toUseGrid.hoverable = true;
+
+            let graphDD@N@_scale = 'all';
+        if (localStorage) {
+            const scaleTemp = localStorage.getItem('graphDD@N@_ranking_history_graph_scale');
+            graphDD@N@_scale = scaleTemp ? scaleTemp : graphDD@N@_scale;
+        }
+        $('#graphDD@N@_scaleBtns button').filter((i,el) => { return $(el).data('pref') == graphDD@N@_scale }).removeClass('primary').addClass('success');
+
+    graphFunctions.push(function () {
+        if ($("#graphDD@N@").is(":visible")) {
+            try {
+                const graphIntegerValues24 = @GRAPHVALUES@; // get 24px icons for the graph ticks
+                const graphData = @GRAPHDATA@;
+                const lpData = @LPDATA@;
+                const rankData = @RANKDATA@;
+                const lpString = 'LP';
+
+                function getGraphData(scale) {
+                    let newData;
+
+                    if (scale == '30-days') {
+                        const thirtyDaysAgo = Date.now() - (30 * 86400 * 1000); // 30 days in milliseconds
+                        newData = graphData.filter(function(el){
+                            return el[0] > thirtyDaysAgo;
+                        });
+                    } else if(scale == 'current-season') {
+                        const seasonStartDate = @SEASONSTART@;
+                        newData = graphData.filter(function(el){
+                            return el[0] > seasonStartDate;
+                        });
+                    } else {
+                        newData = graphData;
+                    }
+
+                    return newData;
+                }
+
+                function initGraph(graphData, xMin, xMax) {
+                    $.plot($("#graphDD@N@"), [graphData], {
+                        xaxis: {mode: 'time', panRange: [xMin,xMax]},
+                        yaxis: {
+                            min: 4,
+                            tickFormatter: function (v) {
+                                if (v > 28) { // for when graph goes to Master and above
+                                    return ((v-28) * 100)+lpString;
+                                }
+                                const graphValue = graphIntegerValues24[v];
+                                if (graphValue === undefined) { // catch-all
+                                    return '';
+                                }
+                                return graphValue.image+' <div style="display:inline-block; width:8px; text-align: left">' + graphValue.rankStr + '</div>';
+                            },
+                            tickDecimals: 0, panDisabled: true, zoomDisabled: true,
+                        },
+                        grid: toUseGrid,
+                        zoom: {interactive: true},
+                        pan: {interactive: true}
+                    });
+                }
+
+                let graphDataObj = {
+                    color: window['wgyellow'] || "wgyellow",
+                    data: getGraphData(graphDD@N@_scale),
+                    lines: {show: true, fill: true, fillColor: {colors: [{opacity: 0.1}, {opacity: 0.6}]}}
+                }
+                initGraph(graphDataObj, graphDataObj.data[0][0], graphDataObj.data[graphDataObj.data.length - 1][0]);
+
+                $("#graphDD@N@").bind("plothover",function(event, pos, item){
+                    if (item) {
+                        const lp = lpData[item.datapoint[0]];
+                        const rank = rankData[item.datapoint[0]];
+                        $("#graph-tooltip").html('<div style="display:flex;align-items:center;">'+rank.image+'<div style="padding-left:4px">'+rank.tierRankString+'<br>'+lpString+': '+lp+'</div></div>').fadeIn(100);
+                    } else {
+                        $("#graph-tooltip").hide();
+                    }
+                });
+            } catch (e) {
+                if (e.message.toString().indexOf("CanvasRenderingContext2D.createLinearGradient") < 0) {
+                    console.warn(e);
+                }
+            }
+        }
+    });
+</script>"""
+
+
+def render_block(n: int, samples: List[Tuple[int, int, int]], season_start: int) -> str:
+    """One rankingHistory-n block: the graph container and its script."""
+    graph: List[str] = []
+    prev_idx: Optional[int] = None
+    for ts, idx, _ in samples:
+        if prev_idx is not None and idx < prev_idx - 1:
+            graph.append(f"[{ts - 1},null]")  # the site breaks the line at resets
+        graph.append(f"[{ts},{idx + 1}]")
+        prev_idx = idx
+    lp_data = "{" + ",".join(f'"{ts}":{lp}' for ts, _, lp in samples) + "}"
+    rank_data = "{" + ",".join(f'"{ts}":{RANK_BODIES[idx]}' for ts, idx, _ in samples) + "}"
+    script = (SCRIPT_TEMPLATE.replace("@N@", str(n))
+              .replace("@GRAPHVALUES@", GRAPH_VALUES)
+              .replace("@GRAPHDATA@", "[" + ",".join(graph) + "]")
+              .replace("@LPDATA@", lp_data)
+              .replace("@RANKDATA@", rank_data)
+              .replace("@SEASONSTART@", str(season_start)))
+    cls = "rankingHistoryGraph hide" if n == 1 else "rankingHistoryGraph otherLeagueRankingHistoryGraph hide"
+    return (f'<a class="historyButton rotatable hideShowButton" data-target="rankingHistory-{n}">\n'
+            f'    <i class="fa fa-angle-down"></i>\n</a>\n'
+            f'<div id="rankingHistory-{n}" class="{cls}">\n'
+            f'    <div class="rankingHistoryGraph__scale" id="graphDD{n}_scaleBtns" data-id="graphDD{n}">\n'
+            f'        <span>Time Periods:</span>\n'
+            f'        <button data-pref="30-days" class="primary">Last 30 days</button>\n'
+            f'        <button data-pref="current-season" class="primary">Current Season</button>\n'
+            f'        <button data-pref="all" class="success">All</button>\n'
+            f'    </div>\n'
+            f'<div class="graph-container">\n        <div class="graph" id="graphDD{n}"></div>\n</div>\n\n'
+            f'{script}\n</div>\n')
+
+
+def _noise_snippets(rng: random.Random) -> List[str]:
+    """Markup of the kind that surrounds the blocks: match rows, ad/config scripts, inline JSON."""
+    out = []
+    for i in range(64):
+        champ = rng.choice(CHAMPIONS)
+        k, d, a = rng.randint(0, 20), rng.randint(0, 15), rng.randint(0, 30)
+        out.append(
+            f'<tr class="{"win" if rng.random() < 0.5 else "loss"}">\n'
+            f'    <td class="championCellLight"><img src="./page_files/{champ}.png" alt="{champ}" '
+            f'title="{champ}" height="36" width="36"></td>\n'
+            f'    <td class="kdaColumn"><span class="kills">{k}</span> / <span class="deaths">{d}</span> / '
+            f'<span class="assists">{a}</span></td>\n'
+            f'    <td class="text-center"><a href="/en/kr/match/kr/{rng.randint(10**9, 10**10)}#participant{i % 10}">'
+            f'{rng.randint(15, 45)}min</a></td>\n</tr>\n')
+        if i % 8 == 0:
+            # JS that trips naive scanners: '};' and braces inside strings, a template literal, a regex
+            out.append(
+                "<script>\n"
+                f"    var adConfig{i} = {{\"slot\": \"top-{i}\", \"html\": \"<div class='x'>}};</div>\", "
+                f"'sizes': [[728, 90], [970, 250]], note: `lpData ${{i}} }}`}};\n"
+                f"    var re{i} = /[{{}}]+/g; // rankData tooltips are filled in below\n"
+                "</script>\n")
+    return out
+
+
+def page_noise(rng: random.Random, snippets: List[str], kb: int) -> str:
+    if kb <= 0:
+        return ""
+    parts, size, i = [], 0, rng.randrange(len(snippets))
+    while size < kb * 1024:
+        s = snippets[i % len(snippets)]
+        parts.append(s)
+        size += len(s)
+        i += 1
+    return "".join(parts)
+
+
+def render_page(title: str, solo: Optional[List[Tuple[int, int, int]]], flex: Optional[List[Tuple[int, int, int]]],
+                season_start: int, rng: random.Random, snippets: List[str], opts: GenOptions) -> str:
+    head = ('<!DOCTYPE html>\n<html lang="en">\n    <head>\n'
+            '        <meta charset="utf-8">\n'
+            f'        <meta name="description" content="{title} - Solo/Duo, Flex ranking history">\n'
+            '        <meta http-equiv="X-UA-Compatible" content="IE=edge">\n'
+            f'        <title>{title} (KR) - LeagueOfGraphs</title>\n'
+            '        <link rel="SHORTCUT ICON" href="https://lolg-cdn.porofessor.gg/img/s/favicon_v2.png">\n'
+            '    </head>\n    <body>\n'
+            '<script language="javascript" type="text/javascript">var graphFunctions = new Array();</script>\n')
+    parts = [head, page_noise(rng, snippets, opts.head_kb)]
+    if solo is not None:
+        parts.append(render_block(1, solo, season_start))
+    parts.append(page_noise(rng, snippets, opts.between_kb))
+    if flex is not None:
+        parts.append(render_block(2, flex, season_start))
+    parts.append(page_noise(rng, snippets, opts.tail_kb))
+    parts.append("    </body>\n</html>\n")
+    return "".join(parts)
+
+
+# -----------------------------
+# Players
+# -----------------------------
+def player_title(rng: random.Random, number: int) -> str:
+    if rng.random() < 0.7:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 7)))
+    else:
+        name = rng.choice(LATIN) + (str(rng.randint(1, 99)) if rng.random() < 0.5 else "")
+    tag = "KR1" if rng.random() < 0.7 else "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789")
+                                                  for _ in range(rng.randint(3, 5)))
+    return f"{name}{number}#{tag}"  # the number keeps titles unique
+
+
+def generate_player(number: int, opts: GenOptions, out_dir: Path) -> Tuple[int, int, int]:
+    """Write one player's page(s); returns (pages, bytes, samples)."""
+    rng = random.Random(f"{opts.seed}:{number}")
+    title = player_title(rng, number)
+    start = opts.end - timedelta(days=round(opts.years * 365.25))
+    seasons = season_starts(start, opts.end, opts.seasons_per_year)
+    solo = simulate_queue(rng, start, opts.end, opts.samples_per_day, opts, seasons)
+    flex = (simulate_queue(rng, start, opts.end, opts.samples_per_day * opts.flex_rate, opts, seasons)
+            if rng.random() < opts.flex_share else None)
+    snippets = _noise_snippets(rng)
+
+    pages = nbytes = 0
+    for k in range(opts.snapshots):
+        saved = opts.end - timedelta(days=opts.snapshot_gap_days * (opts.snapshots - 1 - k))
+        cut = _kst_midnight_ms(saved) + DAY_MS
+        past = [s for s in seasons if s < cut]
+        html = render_page(title,
+                           [s for s in solo if s[0] < cut],
+                           None if flex is None else [s for s in flex if s[0] < cut],
+                           past[-1] if past else cut, rng, snippets, opts)
+        stem = f"{title} (KR) - LeagueOfGraphs" + ("" if k == 0 else f" ({k})")  # later saves get (1), (2), ...
+        data = html.encode("utf-8")
+        if opts.compress == "gz":
+            path = out_dir / f"{stem}.html.gz"
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+        else:
+            path = out_dir / f"{stem}.html"
+        path.write_bytes(data)
+        pages += 1
+        nbytes += len(data)
+    return pages, nbytes, len(solo) + (len(flex) if flex else 0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out-dir", type=Path, default=Path("synthetic"), help="출력 폴더")
+    ap.add_argument("--players", type=int, default=100, help="플레이어 수")
+    ap.add_argument("--years", type=float, default=3.0, help="히스토리 기간 (년)")
+    ap.add_argument("--samples-per-day", type=float, default=3.0, help="게임한 날의 평균 솔랭 기록 수")
+    ap.add_argument("--flex-share", type=float, default=0.6, help="자랭 블록이 있는 플레이어 비율")
+    ap.add_argument("--flex-rate", type=float, default=0.3, help="자랭 기록 수 = 솔랭 기록 수 x 이 값")
+    ap.add_argument("--resample-rate", type=float, default=1.5,
+                    help="하루 평균 '상태 그대로' 재기록 수 (연속 중복 규칙 대상)")
+    ap.add_argument("--iron0-rate", type=float, default=0.01,
+                    help="게임 기록마다 같은 날 'Iron IV 0LP' 글리치가 붙을 확률")
+    ap.add_argument("--iron0-lone-rate", type=float, default=0.01,
+                    help="게임 없는 날마다 'Iron IV 0LP'만 하나 기록되고 다음 날 원래 상태로 돌아올 확률 (샌드위치)")
+    ap.add_argument("--repeat-rate", type=float, default=0.8, help="시즌 시작마다 마지막 상태가 반복 기록될 확률")
+    ap.add_argument("--seasons-per-year", type=int, default=1, help="해마다 시즌(스플릿) 시작 수")
+    ap.add_argument("--head-kb", type=int, default=200, help="블록 앞 페이지 노이즈 (KB)")
+    ap.add_argument("--between-kb", type=int, default=50, help="솔랭/자랭 블록 사이 노이즈 (KB)")
+    ap.add_argument("--tail-kb", type=int, default=2500, help="블록 뒤 노이즈 (KB, 실제 페이지는 약 2.5 MB)")
+    ap.add_argument("--snapshots", type=int, default=1, help="플레이어마다 저장본 수 (--accumulate 테스트용)")
+    ap.add_argument("--snapshot-gap-days", type=int, default=30, help="저장본 사이 간격 (일)")
+    ap.add_argument("--end", default=None, help="히스토리 마지막 날 YYYY-MM-DD (기본 오늘)")
+    ap.add_argument("--compress", choices=["none", "gz"], default="none", help="gz면 *.html.gz로 저장")
+    ap.add_argument("--seed", type=int, default=1, help="난수 시드 (같은 시드 = 같은 페이지)")
+    ap.add_argument("--jobs", type=int, default=1, help="병렬 프로세스 수 (0=CPU 코어 수)")
+    args = ap.parse_args()
+
+    if args.players < 1 or args.snapshots < 1 or args.years <= 0:
+        raise SystemExit("--players/--snapshots는 1 이상, --years는 0보다 커야 함")
+    try:
+        end = date.fromisoformat(args.end) if args.end else date.today()
+    except ValueError:
+        raise SystemExit(f"--end: YYYY-MM-DD 형식이 아님 ({args.end!r})")
+    opts = GenOptions(years=args.years, samples_per_day=args.samples_per_day, flex_share=args.flex_share,
+                      flex_rate=args.flex_rate, resample_rate=args.resample_rate, iron0_rate=args.iron0_rate,
+                      iron0_lone_rate=args.iron0_lone_rate, repeat_rate=args.repeat_rate,
+                      seasons_per_year=max(1, args.seasons_per_year), head_kb=args.head_kb,
+                      between_kb=args.between_kb, tail_kb=args.tail_kb, snapshots=args.snapshots,
+                      snapshot_gap_days=args.snapshot_gap_days, end=end, compress=args.compress, seed=args.seed)
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    numbers = range(1, args.players + 1)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            stats = list(ex.map(generate_player, numbers, [opts] * args.players,
+                                [args.out_dir] * args.players, chunksize=8))
+    else:
+        stats = [generate_player(n, opts, args.out_dir) for n in numbers]
+
+    pages = sum(s[0] for s in stats)
+    nbytes = sum(s[1] for s in stats)
+    samples = sum(s[2] for s in stats)
+    meta = {k: (v.isoformat() if isinstance(v, date) else v) for k, v in asdict(opts).items()}
+    meta.update(players=args.players, pages=pages, bytes=nbytes, samples=samples)
+    (args.out_dir / "synthetic.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"[OK] {args.out_dir}: 플레이어 {args.players}명, 페이지 {pages}개 ({nbytes / 1e6:.1f} MB), "
+          f"기록 {samples}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LeagueOfGraphs saved HTML -> local SQLite history store -> CSV exports.
+
+Instead of re-parsing every saved page for each CSV variant, pages are ingested once into a
+SQLite file and each variant becomes an indexed query.
+
+Tables
+- raw(player, queue, ts, tier, tier_id, rank_id, lp)
+    every usable lpData/rankData entry as parsed (iter_raw_rows of extract_lpdata_daily_last_v2),
+    PRIMARY KEY (player, queue, ts) WITHOUT ROWID, index on ts. Re-ingesting a page upserts,
+    so overlapping snapshots of the same player simply refresh the same rows.
+- daily(queue, player, day, ts, tier, lp, score)
+    preprocess() output (one row per player/queue/day, the daily-last CSV rows), rebuilt from raw
+    for every (player, queue) an ingest touched. PRIMARY KEY (queue, player, day), covering index
+    daily_range on (queue, day, player, tier, lp, score): season and top read only the index, already
+    in (day, player) order. Stores created with the older (queue, day) index are migrated on open.
+
+Commands
+- ingest: HTML files / --in-dir -> raw (+ daily); .lpd.gz sidecars, .html.gz/.html.zst pages and
+  zip/tar bundles are read through the extractor's readers like plain pages
+- daily:  one daily-last CSV per player, '<player>.<queue>.csv', holding every ingested page of the player
+          (the extractor's CSV format; the extractor itself writes '<page stem>.<queue>.csv' per page)
+- season: all players' daily-last rows with --since/--until, one combined CSV sorted by (date, name)
+- top:    each player's highest score within --since/--until (earliest day on ties), one row per player
+
+Usage examples
+  python lpdata_store.py ingest --in-dir . --db lpdata.sqlite3
+  python lpdata_store.py daily --queue flex --out-dir flex_out
+  python lpdata_store.py season --queue solo --since 2025-01-08 --out ../../otherversion/2025season/data.csv
+  python lpdata_store.py top --queue solo --since 2025-01-08 --out ../../otherversion/2025seasontoprating/data.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sqlite3
+import tarfile
+import zipfile
+from datetime import date
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from extract_lpdata_daily_last_v2 import (
+    LP_RANGE,
+    Literals,
+    RecBatch,
+    _block_id,
+    _calc_score_from_ids,
+    _day_to_iso,
+    _input_kind,
+    _iter_bundle_pages,
+    _open_compressed,
+    _page_path,
+    _parse_literals,
+    _select_queues,
+    day_bucketer,
+    iter_input_files,
+    iter_raw_rows,
+    load_sidecar,
+    page_literals,
+    preprocess,
+    queue_block_ids,
+    read_page_prefix,
+    write_csv,
+)
+
+DEFAULT_DB = Path("lpdata.sqlite3")
+HEADER = ["date", "name", "tier", "lp", "score"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS raw (
+    player  TEXT    NOT NULL,
+    queue   TEXT    NOT NULL,
+    ts      INTEGER NOT NULL,
+    tier    TEXT    NOT NULL,
+    tier_id INTEGER NOT NULL,
+    rank_id INTEGER NOT NULL,
+    lp      INTEGER NOT NULL,
+    PRIMARY KEY (player, queue, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS raw_ts ON raw (ts);
+CREATE TABLE IF NOT EXISTS daily (
+    queue  TEXT    NOT NULL,
+    player TEXT    NOT NULL,
+    day    INTEGER NOT NULL,  -- date.toordinal() of the local (--tz) day
+    ts     INTEGER NOT NULL,
+    tier   TEXT    NOT NULL,
+    lp     INTEGER NOT NULL,
+    score  REAL    NOT NULL,
+    PRIMARY KEY (queue, player, day)
+) WITHOUT ROWID;
+DROP INDEX IF EXISTS daily_day;
+CREATE INDEX IF NOT EXISTS daily_range ON daily (queue, day, player, tier, lp, score);
+"""
+
+UPSERT_RAW = """
+INSERT INTO raw (player, queue, ts, tier, tier_id, rank_id, lp) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (player, queue, ts) DO UPDATE SET
+    tier = excluded.tier, tier_id = excluded.tier_id, rank_id = excluded.rank_id, lp = excluded.lp
+"""
+
+
+def open_store(db: Path, tz: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open (and create) the store. The day bucketing time zone is fixed per store: it is recorded
+    on first use and a different tz is refused (daily rows would mix two calendars).
+    """
+    conn = sqlite3.connect(str(db))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    if tz is not None:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'tz'").fetchone()
+        if row is None:
+            with conn:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('tz', ?)", (tz,))
+        elif row[0] != tz:
+            conn.close()
+            raise ValueError(f"{db.name}: 저장소의 시간대는 {row[0]!r} (요청: {tz!r})")
+    return conn
+
+
+# -----------------------------
+# ingest
+# -----------------------------
+def refresh_daily(conn: sqlite3.Connection, player: str, queue: str, tz: str, backend: str = "auto") -> int:
+    """Recompute the daily rows of one (player, queue) from its full raw history. Returns the row count."""
+    recs = RecBatch(player)
+    ts_col, tier_col, lp_col, score_col = recs.ts, recs.tier, recs.lp, recs.score
+    # raw rows ingested before iter_raw_rows checked LP_RANGE may not fit the lp column
+    for ts, tier, tier_id, rank_id, lp in conn.execute(
+            "SELECT ts, tier, tier_id, rank_id, lp FROM raw WHERE player = ? AND queue = ? AND lp BETWEEN ? AND ? "
+            "ORDER BY ts",
+            (player, queue, *LP_RANGE)):
+        ts_col.append(ts)
+        tier_col.append(recs.tier_code(tier))
+        lp_col.append(lp)
+        score_col.append(round(_calc_score_from_ids(tier_id, rank_id, lp), 2))
+    recs.day = day_bucketer(tz).days(ts_col)
+    recs = preprocess(recs, backend)
+
+    tiers = recs.tiers
+    conn.execute("DELETE FROM daily WHERE queue = ? AND player = ?", (queue, player))
+    conn.executemany(
+        "INSERT INTO daily (queue, player, day, ts, tier, lp, score) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((queue, player, day, ts, tiers[tier], lp, round(score, 2))
+         for day, ts, tier, lp, score in zip(recs.day, recs.ts, recs.tier, recs.lp, recs.score)),
+    )
+    return len(recs)
+
+
+def iter_pages(path: Path, queue_opt: str, name: Optional[str]) -> Iterator[Tuple[Path, str, Collection[str], Literals]]:
+    """
+    (page path, player, block ids, literals) for every page of one input, whatever its kind: plain page,
+    .lpd.gz sidecar, .html.gz/.html.zst page or zip/tar bundle (pages are streamed, never unpacked to disk).
+    Raises OSError/EOFError/zipfile.BadZipFile/tarfile.TarError on unreadable archives.
+    """
+    kind = _input_kind(path)
+    if kind == "sidecar":
+        sc = load_sidecar(path)
+        yield (path.with_name(sc.source), *page_literals(sc, name=name))
+    elif kind in ("gz", "zst"):
+        with _open_compressed(path, kind) as f:
+            page = read_page_prefix(f, name is None, queue_block_ids(queue_opt))
+        page_path = _page_path(path)
+        yield (page_path, *page_literals(page, page_path.name, name))
+    elif kind in ("zip", "tar"):
+        for member, f in _iter_bundle_pages(path, kind):
+            page = read_page_prefix(f, name is None, queue_block_ids(queue_opt))
+            yield (path.parent / member, *page_literals(page, member, name))
+    else:
+        yield (path, *page_literals(path.read_bytes(), path.name, name))
+
+
+def ingest_file(conn: sqlite3.Connection, html_path: Path, queue_opt: str, name: Optional[str],
+                tz: str, backend: str = "auto") -> List[str]:
+    """Upsert the raw rows of every page in one input and refresh the daily rows they touched. Returns log lines."""
+    lines: List[str] = []
+    try:
+        pages = iter_pages(html_path, queue_opt, name)
+        for page_path, player, blocks, literals in pages:
+            lines.extend(_ingest_page(conn, page_path, player, blocks, literals, queue_opt, tz, backend))
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        lines.append(f"[SKIP] {html_path.name}: 압축 해제 실패 ({e})")
+        return lines
+    if not lines:
+        lines.append(f"[SKIP] {html_path.name}: 안에 HTML이 없음")
+    return lines
+
+
+def _ingest_page(conn: sqlite3.Connection, page_path: Path, player: str, blocks: Collection[str],
+                 literals: Literals, queue_opt: str, tz: str, backend: str) -> List[str]:
+    """One page's raw upsert + daily refresh, in one transaction."""
+    queues = _select_queues(queue_opt, "rankingHistory-1" in blocks, "rankingHistory-2" in blocks)
+    if not queues:
+        return [f"[SKIP] {page_path.name}: rankingHistory 블록이 없음"]
+
+    lines = []
+    with conn:
+        for q in queues:
+            parsed = _parse_literals(*literals(_block_id(q)))
+            rows = [(player, q) + r for r in iter_raw_rows(*parsed)] if parsed else []
+            if not rows:
+                lines.append(f"[SKIP] {page_path.name}: {q} lpData/rankData 파싱 실패 또는 데이터 없음")
+                continue
+            conn.executemany(UPSERT_RAW, rows)
+            n_daily = refresh_daily(conn, player, q, tz, backend)
+            lines.append(f"[OK] {page_path.name} -> {player} {q} ({len(rows)} raw, {n_daily} days)")
+    return lines
+
+
+# -----------------------------
+# exports
+# -----------------------------
+def _score_str(score: float) -> str:
+    return f"{score:.2f}".rstrip("0").rstrip(".")
+
+
+def _write_rows(rows: Iterable[Sequence], out_file: Path) -> int:
+    """(day, name, tier, lp, score) rows -> CSV in the extractor's format. Returns the row count."""
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with out_file.open("w", newline="", encoding="utf-8-sig") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for day, name, tier, lp, score in rows:
+            w.writerow([_day_to_iso(day), name, tier, lp, _score_str(score)])
+            n += 1
+    return n
+
+
+def _day_range(since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+    lo = date.fromisoformat(since).toordinal() if since else 0
+    hi = date.fromisoformat(until).toordinal() if until else date.max.toordinal()
+    return lo, hi
+
+
+def export_daily(conn: sqlite3.Connection, queue: str, out_dir: Path,
+                 players: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+    """
+    One '<player>.<queue>.csv' per player, in the extractor's CSV format. The extractor writes
+    '<page stem>.<queue>.csv' per page instead; these files hold every ingested page's rows of the player.
+    """
+    if not players:
+        players = [r[0] for r in conn.execute(
+            "SELECT DISTINCT player FROM daily WHERE queue = ? ORDER BY player", (queue,))]
+    out = []
+    for player in players:
+        recs = RecBatch(player)
+        for day, tier, lp, score in conn.execute(
+                "SELECT day, tier, lp, score FROM daily WHERE queue = ? AND player = ? ORDER BY day",
+                (queue, player)):
+            recs.append(0, day, tier, lp, score)
+        if not recs:
+            continue
+        out_file = out_dir / f"{player}.{queue}.csv"
+        write_csv(recs, out_file)
+        out.append((out_file.name, len(recs)))
+    return out
+
+
+def export_season(conn: sqlite3.Connection, queue: str, out_file: Path,
+                  since: Optional[str] = None, until: Optional[str] = None) -> int:
+    """Every player's daily rows with since <= date <= until (range scan of the covering daily_range)."""
+    lo, hi = _day_range(since, until)
+    rows = conn.execute(
+        "SELECT day, player, tier, lp, score FROM daily WHERE queue = ? AND day BETWEEN ? AND ? "
+        "ORDER BY day, player",
+        (queue, lo, hi))
+    return _write_rows(rows, out_file)
+
+
+def export_top(conn: sqlite3.Connection, queue: str, out_file: Path,
+               since: Optional[str] = None, until: Optional[str] = None) -> int:
+    """Each player's best daily row within the range (highest score, earliest day on ties)."""
+    lo, hi = _day_range(since, until)
+    rows = conn.execute(
+        """
+        SELECT day, player, tier, lp, score FROM (
+            SELECT day, player, tier, lp, score,
+                   ROW_NUMBER() OVER (PARTITION BY player ORDER BY score DESC, day) AS rn
+            FROM daily WHERE queue = ? AND day BETWEEN ? AND ?
+        ) WHERE rn = 1 ORDER BY player
+        """,
+        (queue, lo, hi))
+    return _write_rows(rows, out_file)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite 파일 경로 (기본 {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("ingest", help="HTML의 lpData/rankData를 저장소에 upsert")
+    p.add_argument("html", nargs="*", type=Path, help="HTML 파일(여러 개 가능)")
+    p.add_argument("--in-dir", type=Path, default=None,
+                   help="폴더 안의 *.html 전부 처리 (*.html.gz/.html.zst/.zip/.tar*, .lpd.gz 사이드카 포함)")
+    p.add_argument("--queue", choices=["solo", "flex", "both", "auto"], default="auto",
+                   help="넣을 큐 선택 (auto=있는 것만)")
+    p.add_argument("--name", default=None, help="player 강제 지정 (미지정 시 title/파일명에서 추출)")
+    p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                   help="daily 테이블 전처리 방식")
+    p.add_argument("--tz", default="Asia/Seoul",
+                   help="하루 단위 묶음 기준 시간대 (저장소마다 고정, 기본 Asia/Seoul)")
+
+    p = sub.add_parser("daily", help="플레이어별 daily-last CSV 출력")
+    p.add_argument("--queue", choices=["solo", "flex"], default="solo")
+    p.add_argument("--out-dir", type=Path, default=Path("out"), help="출력 폴더")
+    p.add_argument("--player", action="append", default=None, help="이 플레이어만 (여러 번 가능)")
+
+    for cmd, help_ in (("season", "기간 안의 daily 행을 한 CSV로 출력 (date, name 순)"),
+                       ("top", "기간 안에서 플레이어별 최고 점수 행만 출력")):
+        p = sub.add_parser(cmd, help=help_)
+        p.add_argument("--queue", choices=["solo", "flex"], default="solo")
+        p.add_argument("--since", default=None, help="시작 날짜 YYYY-MM-DD (포함)")
+        p.add_argument("--until", default=None, help="끝 날짜 YYYY-MM-DD (포함)")
+        p.add_argument("--out", type=Path, default=Path("data.csv"), help="출력 CSV 경로")
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        try:
+            day_bucketer(args.tz)
+        except Exception:
+            raise SystemExit(f"--tz: 알 수 없는 시간대 {args.tz!r}")
+        files = iter_input_files(args.html, args.in_dir)
+        if not files:
+            raise SystemExit("처리할 HTML 파일이 없음. (*.html)")
+        try:
+            conn = open_store(args.db, args.tz)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        try:
+            for path in files:
+                for line in ingest_file(conn, path, args.queue, args.name, args.tz, args.backend):
+                    print(line)
+        finally:
+            conn.close()
+        return
+
+    if not args.db.is_file():
+        raise SystemExit(f"저장소가 없음: {args.db} (먼저 ingest)")
+    conn = open_store(args.db)
+    try:
+        if args.cmd == "daily":
+            for name, n in export_daily(conn, args.queue, args.out_dir, args.player):
+                print(f"[OK] {name} ({n} rows)")
+        else:
+            try:
+                export = export_season if args.cmd == "season" else export_top
+                n = export(conn, args.queue, args.out, args.since, args.until)
+            except ValueError as e:
+                raise SystemExit(f"--since/--until: {e}")
+            print(f"[OK] {args.out} ({n} rows)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
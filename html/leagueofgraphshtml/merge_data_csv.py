@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-player CSVs (extract_lpdata_daily_last_v2.py output: date,name,tier,lp,score)
+-> one combined data.csv for main.js.
+
+Commands
+- build: stream every input through a heap-based k-way merge on (date, name) and write the
+  combined file in one pass. Only one row per input is held in memory; with more inputs than
+  --max-open the merge runs in rounds over temporary run files, so a ladder of thousands of
+  players never has to fit in RAM (or in the open-file limit).
+
+- update: incremental refresh of an existing combined file from re-extracted per-player CSVs.
+  A state journal next to the output (<out>.state.jsonl) keeps per (name, queue) only the emitted
+  row count, the last emitted date, a digest of the last TAIL_ROWS emitted rows and the input they
+  came from (with its size/mtime). Inputs unchanged since the last run are not opened; the others
+  are read from the first date of their players' tails on (binary search on the date column).
+  A player whose tail still matches contributes its newer rows; if every new row sorts after the
+  end of the file they are simply appended. Otherwise (a page rewrote the end of its history, e.g.
+  after _remove_consecutive_duplicates dropped a day, or a late row lands mid-file) the file is
+  truncated at the first affected date, found the same way, and only that tail is merged and
+  rewritten. Each run appends the records of the players it touched to the journal. Cost follows
+  the changed inputs and new rows, not the size of data.csv. Changes to a player's rows before its
+  tail are not looked for (run build after editing history by hand); without a usable state file
+  update falls back to build.
+
+data.csv has no queue column, so one combined file holds one queue: inputs that mix *.solo.csv
+and *.flex.csv (or an update whose queue differs from the state's) are rejected.
+
+Rows with the same (date, name) from different inputs are collapsed; the input listed last wins
+(e.g. pass re-saved pages after the originals).
+
+Usage examples
+  python merge_data_csv.py build solo_out --out ../../data.csv
+  python merge_data_csv.py update solo_out --out ../../data.csv
+  python merge_data_csv.py build flex_out ../leagueofgraphshtml_new/flex_out --pattern "*.flex.csv" --out data.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import hashlib
+import heapq
+import io
+import json
+import os
+import tempfile
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+HEADER = ["date", "name", "tier", "lp", "score"]
+
+Row = List[str]
+
+
+def _key(row: Row) -> Tuple[str, str]:
+    return row[0], row[1]
+
+
+@dataclass
+class MergeStats:
+    files: int = 0
+    rows: int = 0
+    duplicates: int = 0
+
+
+def iter_csv_inputs(paths: List[Path], pattern: str) -> List[Path]:
+    """Files as given, directories expanded with pattern (sorted); duplicates removed, order kept."""
+    files: List[Path] = []
+    for p in paths:
+        if p.is_dir():
+            files.extend(sorted(p.glob(pattern)))
+        elif p.is_file():
+            files.append(p)
+
+    seen = set()
+    out: List[Path] = []
+    for p in files:
+        rp = p.resolve()
+        if rp not in seen:
+            seen.add(rp)
+            out.append(rp)
+    return out
+
+
+def _data_start(f: BinaryIO) -> int:
+    """Offset of the first data line (after the header line, if the file starts with one)."""
+    f.seek(0)
+    first = f.readline()
+    return f.tell() if first.startswith(codecs.BOM_UTF8 + b"date,") or first.startswith(b"date,") else 0
+
+
+def _seek_date(f: BinaryIO, date: str) -> int:
+    """
+    Offset of the first line dated >= date (end of file if none) in a CSV sorted by date,
+    found by binary search over byte offsets: only O(log size) lines are read.
+    """
+    target = date.encode("utf-8")
+    lo = _data_start(f)                # a line start; every line before it is dated < date
+    hi = f.seek(0, os.SEEK_END)        # a line start (or the end) dated >= date
+    while lo < hi:
+        mid = (lo + hi) // 2
+        pos = lo
+        if mid > lo:
+            f.seek(mid - 1)
+            f.readline()
+            if f.tell() < hi:
+                pos = f.tell()         # first line start at or after mid
+        f.seek(pos)
+        line = f.readline()
+        if line.split(b",", 1)[0] >= target:
+            hi = pos
+        else:
+            lo = f.tell()
+    return lo
+
+
+def read_rows(path: Path, since: Optional[str] = None) -> Iterator[Row]:
+    """
+    Data rows of one CSV (header / repeated header rows skipped); must be sorted by (date, name).
+    since: start at the first row dated >= since (binary search; earlier rows are not read).
+    """
+    with path.open("rb") as raw:
+        if since is not None:
+            raw.seek(_seek_date(raw, since))
+        with io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as f:
+            prev = None
+            for row in csv.reader(f):
+                if not row or row[:2] == HEADER[:2]:
+                    continue
+                key = _key(row)
+                if prev is not None and key < prev:
+                    raise ValueError(f"{path.name}: (date, name) 순서로 정렬되어 있지 않음 ({prev} -> {key})")
+                prev = key
+                yield row
+
+
+def merge_rows(sources: Iterable[Iterable[Row]], stats: MergeStats) -> Iterator[Row]:
+    """
+    k-way merge of sorted row streams on (date, name).
+    heapq.merge is stable, so among equal keys the later source comes last; that row is kept.
+    """
+    pending = None
+    for row in heapq.merge(*sources, key=_key):
+        if pending is not None:
+            if _key(row) == _key(pending):
+                stats.duplicates += 1
+            else:
+                yield pending
+        pending = row
+    if pending is not None:
+        yield pending
+
+
+def write_rows(rows: Iterable[Row], out_file: Path, bom: bool = True) -> int:
+    """Write header + rows to out_file atomically (temp file + rename). Returns the row count."""
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_file.with_name(out_file.name + ".tmp")
+    n = 0
+    with tmp.open("w", newline="", encoding="utf-8-sig" if bom else "utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for row in rows:
+            w.writerow(row)
+            n += 1
+    os.replace(tmp, out_file)
+    return n
+
+
+def _source(tracker: Optional["StateTracker"], level: int, k: int, path: Path) -> Iterator[Row]:
+    """Rows of input k (round 0) or of a run file; the tracker sees which inputs hold which players."""
+    return tracker.read(k, path) if tracker is not None and level == 0 else read_rows(path)
+
+
+def build(inputs: List[Path], out_file: Path, max_open: int = 256,
+          tracker: Optional["StateTracker"] = None) -> MergeStats:
+    """tracker (update's full build) sees the inputs as they are read and the rows as they are written."""
+    stats = MergeStats(files=len(inputs))
+    max_open = max(2, max_open)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix=".merge_", dir=out_file.parent) as tmp:
+        runs = list(inputs)
+        level = 0
+        # merge rounds: contiguous groups keep the input order, so "last input wins" still holds
+        while len(runs) > max_open:
+            next_runs: List[Path] = []
+            for k in range(0, len(runs), max_open):
+                run = Path(tmp) / f"run{level}_{k // max_open}.csv"
+                sources = [_source(tracker, level, k + j, p) for j, p in enumerate(runs[k:k + max_open])]
+                write_rows(merge_rows(sources, stats), run, bom=False)
+                next_runs.append(run)
+            runs = next_runs
+            level += 1
+
+        rows = merge_rows([_source(tracker, level, k, p) for k, p in enumerate(runs)], stats)
+        stats.rows = write_rows(tracker.emit(rows) if tracker is not None else rows, out_file)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# update (incremental)
+# ---------------------------------------------------------------------------
+
+STATE_VERSION = 3
+# emitted rows per player covered by the state's tail digest; update compares inputs from the first of them on
+TAIL_ROWS = 16
+
+
+def state_path_for(out_file: Path) -> Path:
+    return out_file.with_name(out_file.name + ".state.jsonl")
+
+
+def queue_of(path: Path) -> str:
+    """'<page>.solo.csv' -> 'solo' (extract_lpdata_daily_last_v2.py output naming); '' if absent."""
+    q = Path(path.stem).suffix.lstrip(".")
+    return q if q in ("solo", "flex") else ""
+
+
+def _player_key(name: str, queue: str) -> str:
+    return f"{queue}\t{name}"
+
+
+def _encode_row(row: Row) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(row)
+    return buf.getvalue().encode("utf-8")
+
+
+def _tail_digest(rows: Iterable[Row]) -> str:
+    """Rolling digest of a player's last emitted rows (a change detector, not a signature)."""
+    h = hashlib.blake2b(digest_size=8)
+    for row in rows:
+        h.update("\x1f".join(row).encode("utf-8") + b"\x1e")
+    return h.hexdigest()
+
+
+def input_queue(inputs: List[Path]) -> str:
+    """The one queue the inputs belong to ('' for other naming); ValueError if they mix queues."""
+    queues = sorted({queue_of(p) for p in inputs} - {""})
+    if len(queues) > 1:
+        raise ValueError("solo/flex CSV가 섞여 있음 (data.csv에는 큐 컬럼이 없음): "
+                         "--pattern '*.solo.csv' 또는 '*.flex.csv'로 한 큐만 지정")
+    return queues[0] if queues else ""
+
+
+def _file_sig(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _player_record(rows: int, window: List[Row], source: str, sig: Tuple[int, int]) -> dict:
+    """
+    State of one (name, queue): emitted row count, last emitted date, the digest of the last
+    TAIL_ROWS emitted rows and the date they start at, and the input (+ its size/mtime) it was
+    last read from.
+    """
+    return {
+        "rows": rows,
+        "last": window[-1][0] if window else None,
+        "from": window[0][0] if window else None,
+        "tail": _tail_digest(window),
+        "source": source,
+        "sig": list(sig),
+    }
+
+
+class StateTracker:
+    """Builds the per-player state while build() streams the rows, without holding them."""
+
+    def __init__(self, queue: str):
+        self.queue = queue
+        self.sources: Dict[str, int] = {}   # name -> last input (index) it appears in
+        self.counts: Dict[str, int] = {}
+        self.windows: Dict[str, Deque[Row]] = {}
+
+    def read(self, k: int, path: Path) -> Iterator[Row]:
+        for row in read_rows(path):
+            if self.sources.get(row[1], -1) < k:
+                self.sources[row[1]] = k
+            yield row
+
+    def emit(self, rows: Iterable[Row]) -> Iterator[Row]:
+        for row in rows:
+            name = row[1]
+            self.counts[name] = self.counts.get(name, 0) + 1
+            window = self.windows.get(name)
+            if window is None:
+                window = self.windows[name] = deque(maxlen=TAIL_ROWS)
+            window.append(row)
+            yield row
+
+    def players(self, inputs: List[Path]) -> Dict[str, dict]:
+        sigs = {k: _file_sig(inputs[k]) for k in set(self.sources.values())}
+        return {
+            _player_key(name, self.queue): _player_record(n, list(self.windows[name]), str(inputs[self.sources[name]]),
+                                                          sigs[self.sources[name]])
+            for name, n in self.counts.items()
+        }
+
+
+# The state file is a journal of JSON lines: a header, then player records, each run's records
+# closed by a commit line with the combined file's size/mtime. An update appends the records of the
+# players it touched; records after the last commit (an interrupted run) are ignored, and the
+# journal is rewritten compactly once stale records outnumber the live ones.
+
+def _commit_line(out_file: Path) -> str:
+    size, mtime_ns = _file_sig(out_file)
+    return json.dumps({"commit": {"size": size, "mtime_ns": mtime_ns}}) + "\n"
+
+
+def _record_lines(players: Dict[str, dict]) -> Iterator[str]:
+    for key, rec in players.items():
+        yield json.dumps({"key": key, **rec}, ensure_ascii=False, sort_keys=True) + "\n"
+
+
+def write_state(state_file: Path, out_file: Path, queue: str, players: Dict[str, dict]) -> None:
+    header = {"version": STATE_VERSION, "out": out_file.name, "queue": queue}
+    tmp = state_file.with_name(state_file.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        f.writelines(_record_lines(dict(sorted(players.items()))))
+        f.write(_commit_line(out_file))
+    os.replace(tmp, state_file)
+
+
+def append_state(state_file: Path, out_file: Path, touched: Dict[str, dict]) -> None:
+    with state_file.open("a", encoding="utf-8") as f:
+        f.writelines(_record_lines(touched))
+        f.write(_commit_line(out_file))
+
+
+def load_state(state_file: Path, out_file: Path) -> Optional[dict]:
+    """
+    {"queue", "players", "records"} from the journal, or None if missing / unreadable / stale
+    (combined file changed outside update).
+    """
+    try:
+        with state_file.open(encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != STATE_VERSION or not out_file.is_file():
+                return None
+            players: Dict[str, dict] = {}
+            pending: Dict[str, dict] = {}
+            sig = None
+            records = 0
+            for line in f:
+                doc = json.loads(line)
+                if "commit" in doc:
+                    players.update(pending)
+                    pending = {}
+                    sig = (doc["commit"]["size"], doc["commit"]["mtime_ns"])
+                else:
+                    pending[doc.pop("key")] = doc
+                    records += 1
+        if sig != _file_sig(out_file):
+            return None
+        return {"queue": header["queue"], "players": players, "records": records}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def _last_row(out_file: Path) -> Optional[Row]:
+    """Last row of the combined file, read backwards from its end."""
+    with out_file.open("rb") as f:
+        start = _data_start(f)
+        end = f.seek(0, os.SEEK_END)
+        back = 4096
+        while True:
+            pos = max(start, end - back)
+            f.seek(pos)
+            chunk = f.read(end - pos).rstrip(b"\r\n")
+            i = chunk.rfind(b"\n")
+            if i >= 0 or pos == start:
+                line = chunk[i + 1:]
+                return next(csv.reader([line.decode("utf-8")])) if line else None
+            back *= 2
+
+
+@dataclass
+class UpdateStats:
+    mode: str = ""          # "build" | "append" | "rewrite" | "noop"
+    players: int = 0
+    unchanged: int = 0
+    appended: int = 0       # new rows from players whose history matched
+    rewritten: int = 0      # players whose history changed
+    tail_rows: int = 0      # rows written from the cut offset on (append: = appended)
+    cut_date: str = ""
+    read: int = 0           # inputs opened (the others were unchanged since the last run)
+
+
+def _full_build(inputs: List[Path], out_file: Path, state_file: Path, max_open: int) -> UpdateStats:
+    queue = input_queue(inputs)
+    tracker = StateTracker(queue)
+    build(inputs, out_file, max_open, tracker)
+    players = tracker.players(inputs)
+    write_state(state_file, out_file, queue, players)
+    return UpdateStats(mode="build", players=len(players), read=len(inputs))
+
+
+def _read_input(path: Path, queue: str, players: Dict[str, dict], since: Optional[str],
+                expect: Iterable[str] = ()) -> Dict[str, List[Row]]:
+    """
+    Rows per player key of one input, read from since on. If the input holds a player the state
+    does not know or one whose tail starts before since, or lacks one of the expected players
+    (those last read from it: its tail may have been cut off), it is read again from the start.
+    """
+    rows: Dict[str, List[Row]] = {}
+    for row in read_rows(path, since):
+        key = _player_key(row[1], queue)
+        if since is not None:
+            rec = players.get(key)
+            if rec is None or not rec["rows"] or rec["from"] < since:
+                return _read_input(path, queue, players, None)
+        rows.setdefault(key, []).append(row)
+    if since is not None and any(key not in rows for key in expect):
+        return _read_input(path, queue, players, None)
+    return rows
+
+
+def update(inputs: List[Path], out_file: Path, state_file: Optional[Path] = None,
+           max_open: int = 256) -> UpdateStats:
+    """
+    Refresh out_file with the given (re-extracted) inputs.
+    Players not among the inputs keep their rows; for players among them the result equals what
+    build would produce from their current CSVs, given that their rows before the last TAIL_ROWS
+    emitted ones did not change (those are not read again).
+    """
+    state_file = state_file or state_path_for(out_file)
+    state = load_state(state_file, out_file)
+    if state is None:
+        # no usable state (first run, or the file was edited by hand): rebuild from the inputs
+        return _full_build(inputs, out_file, state_file, max_open)
+
+    queue = input_queue(inputs)
+    if queue and state["queue"] and queue != state["queue"]:
+        raise ValueError(f"{out_file.name}는 {state['queue']} 기준인데 입력은 {queue} CSV임")
+    queue = queue or state["queue"]
+    players: Dict[str, dict] = state["players"]
+    stats = UpdateStats(mode="noop")
+
+    # inputs that every player last read from them still match (size, mtime) are not opened
+    order = {str(p): k for k, p in enumerate(inputs)}
+    sigs = {str(p): _file_sig(p) for p in inputs}
+    by_source: Dict[str, List[str]] = {}
+    for key, rec in players.items():
+        by_source.setdefault(rec["source"], []).append(key)
+    skipped = {path for path in order if path in by_source
+               and all(players[key]["sig"] == list(sigs[path]) for key in by_source[path])}
+
+    # current rows per key as (input index, rows); a player found in a changed input is also
+    # read from its skipped source, so the later-input-wins merge sees every input holding it
+    found: Dict[str, List[Tuple[int, List[Row]]]] = {}
+    pending = [path for path in order if path not in skipped]
+    while pending:
+        for path in pending:
+            skipped.discard(path)
+            stats.read += 1
+            expect = [key for key in by_source.get(path, []) if players[key]["rows"]]
+            since = min(players[key]["from"] for key in expect) if expect else None
+            for key, rows in _read_input(Path(path), queue, players, since, expect).items():
+                found.setdefault(key, []).append((order[path], rows))
+        pending = sorted({players[key]["source"] for key in found
+                          if key in players and players[key]["source"] in skipped}, key=order.get)
+
+    fresh_rows: List[Row] = []              # rows after an unchanged emitted history
+    rewritten: Dict[str, str] = {}          # name -> date its rows are replaced from
+    rewrite_rows: List[Row] = []
+    cut_date: Optional[str] = None
+    touched: Dict[str, dict] = {}
+
+    for key, parts in found.items():
+        stats.players += 1
+        parts.sort(key=lambda part: part[0])
+        source = str(inputs[parts[-1][0]])
+        rows = list(merge_rows([r for _, r in parts], MergeStats()))
+        rec = players.get(key)
+        if rec is None or not rec["rows"]:
+            # new player: nothing of it in the file yet, every row is new
+            fresh_rows.extend(rows)
+            stats.appended += len(rows)
+            first = rows[0][0]
+            touched[key] = _player_record(len(rows), rows[-TAIL_ROWS:], source, sigs[source])
+        else:
+            rows = [r for r in rows if r[0] >= rec["from"]]
+            n_tail = min(TAIL_ROWS, rec["rows"])
+            if _tail_digest(rows[:n_tail]) == rec["tail"]:
+                fresh = rows[n_tail:]
+                if not fresh:
+                    stats.unchanged += 1
+                    if rec["source"] != source or rec["sig"] != list(sigs[source]):
+                        touched[key] = {**rec, "source": source, "sig": list(sigs[source])}
+                    continue
+                fresh_rows.extend(fresh)
+                stats.appended += len(fresh)
+                first = fresh[0][0]
+                total = rec["rows"] + len(fresh)
+            else:
+                # rewritten tail: its rows from the tail's first date are replaced by the current ones
+                first = rec["from"]
+                rewritten[rows[0][1] if rows else key.split("\t", 1)[1]] = first
+                rewrite_rows.extend(rows)
+                stats.rewritten += 1
+                total = rec["rows"] - n_tail + len(rows)
+            window = rows[-TAIL_ROWS:]
+            if len(window) < min(TAIL_ROWS, total):
+                # the new tail reaches back before the rows read: take it from the whole inputs
+                full = [_read_input(inputs[k], queue, players, None).get(key, []) for k, _ in parts]
+                window = list(merge_rows(full, MergeStats()))[-TAIL_ROWS:]
+            touched[key] = _player_record(total, window, source, sigs[source])
+        if cut_date is None or first < cut_date:
+            cut_date = first
+
+    idle = sum(1 for path in skipped for _ in by_source[path])
+    stats.players += idle
+    stats.unchanged += idle
+
+    if cut_date is not None:
+        new_rows = fresh_rows + rewrite_rows
+        new_rows.sort(key=_key)
+        last = _last_row(out_file)
+        stats.cut_date = cut_date
+        if not rewritten and new_rows and (last is None or _key(new_rows[0]) > _key(last)):
+            # fast path: everything sorts after the current end of the file
+            stats.mode = "append"
+            with out_file.open("ab") as f:
+                for row in merge_rows([new_rows], MergeStats()):
+                    f.write(_encode_row(row))
+                    stats.tail_rows += 1
+        else:
+            # localized rewrite: truncate at the first affected date and merge the tail
+            stats.mode = "rewrite"
+            tail = [r for r in read_rows(out_file, cut_date)
+                    if not (r[1] in rewritten and r[0] >= rewritten[r[1]])]
+            with out_file.open("r+b") as f:
+                f.truncate(_seek_date(f, cut_date))
+                f.seek(0, os.SEEK_END)
+                for row in merge_rows([tail, new_rows], MergeStats()):
+                    f.write(_encode_row(row))
+                    stats.tail_rows += 1
+
+    if touched:
+        players.update(touched)
+        if state["records"] + len(touched) > 2 * len(players) + 100:
+            write_state(state_file, out_file, queue, players)
+        else:
+            append_state(state_file, out_file, touched)
+    return stats
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="개인별 CSV들을 (date, name) 순서로 합쳐 data.csv 생성")
+    b.add_argument("inputs", nargs="+", type=Path, help="CSV 파일 또는 폴더(여러 개 가능)")
+    b.add_argument("--pattern", default="*.csv", help="폴더 안에서 읽을 파일 패턴 (기본 *.csv)")
+    b.add_argument("--out", type=Path, default=Path("data.csv"), help="출력 CSV 경로")
+    b.add_argument("--max-open", type=int, default=256,
+                   help="한 번에 열어둘 입력 파일 수 (넘으면 임시 파일로 여러 단계 병합)")
+
+    u = sub.add_parser("update", help="기존 data.csv에 새로 추출한 CSV의 새 날짜만 반영 (증분)")
+    u.add_argument("inputs", nargs="+", type=Path, help="CSV 파일 또는 폴더(여러 개 가능)")
+    u.add_argument("--pattern", default="*.csv", help="폴더 안에서 읽을 파일 패턴 (기본 *.csv)")
+    u.add_argument("--out", type=Path, default=Path("data.csv"), help="갱신할 CSV 경로")
+    u.add_argument("--state", type=Path, default=None,
+                   help="증분 상태 파일 경로 (기본 <out>.state.jsonl)")
+    u.add_argument("--max-open", type=int, default=256,
+                   help="상태 파일이 없어서 전체 build로 돌아갈 때 쓰는 --max-open")
+    args = ap.parse_args()
+
+    inputs = iter_csv_inputs(args.inputs, args.pattern)
+    if not inputs:
+        raise SystemExit("합칠 CSV 파일이 없음.")
+    try:
+        input_queue(inputs)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    if args.cmd == "update":
+        try:
+            st = update(inputs, args.out, args.state, args.max_open)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        if st.mode == "build":
+            print(f"[OK] {args.out}: 상태 파일 없음 -> 전체 build ({st.players}명)")
+        elif st.mode == "noop":
+            print(f"[OK] {args.out}: 변경 없음 ({st.players}명)")
+        else:
+            print(f"[OK] {args.out}: {st.mode} from {st.cut_date} "
+                  f"(새 행 {st.appended}개, 기록 변경 {st.rewritten}명, 변경 없음 {st.unchanged}명, "
+                  f"다시 쓴 행 {st.tail_rows}개, 읽은 입력 {st.read}개)")
+        return
+
+    try:
+        stats = build(inputs, args.out, args.max_open)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"[OK] {args.out} ({stats.rows} rows from {stats.files} files, 중복 {stats.duplicates}개 제거)")
+
+
+if __name__ == "__main__":
+    main()